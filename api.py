@@ -0,0 +1,154 @@
+import hashlib
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_login import current_user
+from sqlalchemy import func, select
+from models import db, User, TimetableSlot
+
+API_PREFIX = '/api/v1'
+
+
+def api_login_required(view):
+    # مثل login_required لكن يعيد 401 بصيغة JSON بدل التحويل لصفحة الدخول
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return error(401, 'unauthorized')
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def error(status, message):
+    return jsonify({'error': message}), status
+
+
+# المخرجات مختصرة: القيم الفارغة لا ترسل
+
+def _compact(data):
+    return {key: value for key, value in data.items() if value is not None}
+
+
+def serialize_subject(subject):
+    if subject is None:
+        return None
+    return {'id': subject.id, 'name': subject.name, 'class_level': subject.class_level}
+
+
+def serialize_user(user):
+    data = {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'user_type': user.user_type,
+        'image': user.image,
+    }
+    if user.user_type == 'student':
+        data['student_class'] = user.student_class
+    else:
+        data.update(
+            subject=serialize_subject(user.subject),
+            specialization=user.specialization,
+            hourly_rate=user.hourly_rate,
+            bio=user.bio,
+            rating=round(user.rating or 0.0, 2),
+            rating_count=user.rating_count or 0,
+        )
+    return _compact(data)
+
+
+def serialize_grid(grid):
+    # الحصص المشغولة فقط بدل الشبكة الكاملة بخلاياها الفارغة
+    slots = []
+    for row in grid['periods']:
+        for (day, _), cell in zip(grid['days'], row['cells']):
+            if cell:
+                slots.append(_compact(dict(cell, day=day, period=row['period'])))
+    return slots
+
+
+def serialize_page(page, serializer):
+    return {
+        'items': [serializer(item) for item in page],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    }
+
+
+# اختيار الحقول: ?fields=id,first_name,subject.name
+
+def parse_fields(value):
+    tree = {}
+    for path in filter(None, (part.strip() for part in (value or '').split(','))):
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def select_fields(data, tree):
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [select_fields(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: select_fields(data[key], subtree) for key, subtree in tree.items() if key in data}
+    return data
+
+
+def _apply_fields(payload, tree):
+    # في القوائم تطبق الحقول على كل عنصر، ويبقى المؤشران كما هما
+    if 'items' in payload:
+        return dict(payload, items=select_fields(payload['items'], tree))
+    return select_fields(payload, tree)
+
+
+# ETag قوية تشتق من أرقام نسخ الصفوف (واستعلام تجميعي صغير للقوائم)، فيرد بـ 304
+# دون تحميل الكائنات وعلاقاتها. المسار الكامل مع معاملاته (الحقول والمؤشر) جزء منها
+
+def make_etag(*parts):
+    return hashlib.sha1(repr((request.full_path,) + parts).encode()).hexdigest()
+
+
+def conditional(version, build):
+    etag = make_etag(version)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(_apply_fields(build(), parse_fields(request.args.get('fields'))))
+    response.set_etag(etag)
+    # المتصفح والتطبيق يعيدان التحقق في كل مرة، والاستجابة خاصة بالمستخدم
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def user_version(user_id):
+    return db.session.execute(
+        select(User.user_type, User.version, User.subject_id).where(User.id == user_id)
+    ).first()
+
+
+def class_roster_version(class_level):
+    # أي إضافة أو حذف يغير العدد أو مجموع المعرفات، وأي تعديل يزيد مجموع النسخ
+    return tuple(db.session.execute(
+        select(func.count(User.id), func.sum(User.id), func.sum(User.version))
+        .where(User.user_type == 'student', User.student_class == class_level)
+    ).one())
+
+
+def _timetable_version(condition):
+    # الحصص نفسها، ونسخ المدرسين لأن أسماءهم تظهر في جدول الصف
+    return tuple(db.session.execute(
+        select(func.count(TimetableSlot.id), func.sum(TimetableSlot.id), func.max(TimetableSlot.updated_at),
+               func.sum(User.version))
+        .outerjoin(User, User.id == TimetableSlot.teacher_id)
+        .where(condition)
+    ).one())
+
+
+def class_timetable_version(class_level):
+    return _timetable_version(TimetableSlot.class_level == class_level)
+
+
+def teacher_timetable_version(teacher_id):
+    return _timetable_version(TimetableSlot.teacher_id == teacher_id)
@@ -0,0 +1,190 @@
+# اختبار حمل للمسارات الرئيسية على قاعدة بيانات محلية (SQLite أو PostgreSQL)
+#
+#   DATABASE_URL=sqlite:////tmp/academy-bench.db flask --app app db upgrade
+#   DATABASE_URL=sqlite:////tmp/academy-bench.db flask --app app seed --students 50000 --tutors 2000
+#   DATABASE_URL=sqlite:////tmp/academy-bench.db python benchmarks/load_test.py --requests 200 --concurrency 8
+#
+# يطبع لكل مسار زمن الاستجابة (p50/p95/p99) والإنتاجية ومتوسط عدد استعلامات SQL،
+# ويحفظ النتائج بصيغة JSON في benchmarks/results لمقارنة التشغيلات عبر الزمن
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import g
+from sqlalchemy import func, select
+from wsgi import app
+from models import db
+from models import User, Rating, Enrollment, AssignmentSubmission, Lecture
+from seed_data import CLASS_LEVELS
+
+
+@app.after_request
+def _report_sql_count(response):
+    response.headers['X-SQL-Statements'] = str(g.get('sql_statements', 0))
+    return response
+
+
+def ensure_account(username, user_type):
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        user = User(first_name=username, last_name='load', email=f'{username}@load.test',
+                    username=username, user_type=user_type)
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+    return user.username
+
+
+def sample_ids(user_type, limit=500):
+    return list(db.session.scalars(select(User.id).filter_by(user_type=user_type).limit(limit)))
+
+
+def build_routes(fixtures):
+    rng = random.Random()
+    return {
+        'login': ('anonymous', lambda: ('POST', '/login', {
+            'identifier': rng.choice(fixtures['student_usernames']), 'password': 'password'})),
+        'owner_panel': ('owner', lambda: ('GET', '/owner', None)),
+        'teacher_class': ('teacher', lambda: ('GET', f'/teacher_class/{rng.choice(CLASS_LEVELS)}', None)),
+        'teacher_profile': ('student', lambda: ('GET', f'/teacher_profile/{rng.choice(fixtures["tutor_ids"])}',
+                                                None)),
+        'student_dashboard': ('student', lambda: ('GET', '/student_dashboard', None)),
+    }
+
+
+def login(client, username):
+    response = client.post('/login', data={'identifier': username, 'password': 'password'})
+    if response.status_code != 302:
+        raise RuntimeError(f'login failed for {username}')
+
+
+def run_route(name, role, make_request, fixtures, total, concurrency):
+    latencies, sql_counts, errors = [], [], []
+    remaining = iter(range(total))
+    lock = threading.Lock()
+
+    def client_loop():
+        client = app.test_client()
+        if role != 'anonymous':
+            login(client, fixtures['accounts'][role])
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            method, path, data = make_request()
+            start = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+            latencies.append(elapsed)
+            sql_counts.append(int(response.headers.get('X-SQL-Statements', 0)))
+            if name == 'login':
+                client.get('/logout')
+
+    threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': round(len(latencies) / wall, 1),
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'sql_statements_avg': round(sum(sql_counts) / len(sql_counts), 2) if sql_counts else None,
+        'sql_statements_max': max(sql_counts) if sql_counts else None,
+    }
+
+
+def dataset_size():
+    return {
+        'students': db.session.scalar(select(func.count()).select_from(User).filter_by(user_type='student')),
+        'tutors': db.session.scalar(select(func.count()).select_from(User).filter_by(user_type='tutor')),
+        'ratings': db.session.scalar(select(func.count()).select_from(Rating)),
+        'enrollments': db.session.scalar(select(func.count()).select_from(Enrollment)),
+        'submissions': db.session.scalar(select(func.count()).select_from(AssignmentSubmission)),
+        'lectures': db.session.scalar(select(func.count()).select_from(Lecture)),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--routes', nargs='+')
+    parser.add_argument('--output', help='JSON file (default: benchmarks/results/load_<timestamp>.json)')
+    args = parser.parse_args()
+
+    # الاختبار يرسل النماذج مباشرة دون صفحة الدخول، فنوقف التحقق من CSRF
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    with app.app_context():
+        students = list(db.session.scalars(select(User.username).filter_by(user_type='student').limit(500)))
+        if not students:
+            raise SystemExit('No students found: run "flask seed" first')
+        fixtures = {
+            'student_usernames': students,
+            'tutor_ids': sample_ids('tutor') or sample_ids('teacher'),
+            'accounts': {
+                'owner': ensure_account('loadtest_owner', 'owner'),
+                'teacher': ensure_account('loadtest_teacher', 'teacher'),
+                'student': students[0],
+            },
+        }
+        size = dataset_size()
+        dialect = db.engine.dialect.name
+
+    routes = build_routes(fixtures)
+    selected = args.routes or list(routes)
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'database': dialect,
+        'dataset': size,
+        'concurrency': args.concurrency,
+        'routes': {},
+    }
+    for name in selected:
+        role, make_request = routes[name]
+        report['routes'][name] = run_route(name, role, make_request, fixtures, args.requests, args.concurrency)
+        print(name, json.dumps(report['routes'][name]))
+
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"load_{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f'Saved {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# اختبار حمل لمجمع الاتصالات: عدة خيوط تطلب اتصالات في الوقت نفسه
+# وتحتفظ بها لمدة محددة، ثم تطبع حالة المجمع (الانتظار، الفائض، نفاد المهلة)
+#
+#   DATABASE_URL=postgresql://... DB_POOL_SIZE=5 DB_MAX_OVERFLOW=5 \
+#       python benchmarks/pool_load.py --workers 30 --requests 20 --hold-ms 50
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from wsgi import app
+from models import db
+import db_pool
+
+
+def worker(requests, hold, results):
+    with app.app_context():
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                with db.engine.connect() as conn:
+                    conn.execute(text('SELECT 1'))
+                    time.sleep(hold)
+                results.append(time.perf_counter() - start)
+            except PoolTimeout:
+                results.append(None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--hold-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(args.requests, args.hold_ms / 1000, results))
+               for _ in range(args.workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ok = sorted(r for r in results if r is not None)
+    with app.app_context():
+        status = db_pool.pool_status(db.engine)
+    print(json.dumps({
+        'workers': args.workers,
+        'requests': len(results),
+        'failed': len(results) - len(ok),
+        'throughput_rps': round(len(ok) / elapsed, 1),
+        'p50_ms': round(ok[len(ok) // 2] * 1000, 2) if ok else None,
+        'p95_ms': round(ok[int(len(ok) * 0.95)] * 1000, 2) if ok else None,
+        'pool': status,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# زمن إقلاع العامل: استيراد الوحدات ثم بناء التطبيق ثم أول طلب
+#
+#   python benchmarks/startup.py --rounds 7 --baseline HEAD~1
+#
+# كل جولة عملية Python جديدة مع -X importtime (مثل عامل gunicorn بعد إعادة التشغيل)، تقيس
+# زمن "from wsgi import app" وزمن أول طلب إلى /login، وتجمع أثقل الحزم المستوردة.
+# مع --baseline تقاس نسخة أخرى من المستودع (git archive) بالطريقة نفسها للمقارنة
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results', 'startup.json')
+# وحدات لا يحتاجها عامل الويب عند الإقلاع (سطر الأوامر، Redis، الصور، البريد)
+DEFERRED = ('flask_migrate', 'alembic', 'redis', 'PIL', 'smtplib', 'email.mime.text')
+
+# النسخ القديمة تبني التطبيق عند استيراد app.py، والحالية في wsgi.py عبر create_app
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+try:
+    from wsgi import app
+except ImportError:
+    from app import app
+ready = time.perf_counter()
+status = app.test_client().get('/login').status_code
+first = time.perf_counter()
+print(json.dumps({'import_ms': (ready - start) * 1000, 'first_request_ms': (first - ready) * 1000,
+                  'status': status, 'deferred_loaded': [m for m in %r if m in sys.modules]}))
+'''
+
+IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+
+
+def top_packages(stderr, limit):
+    # الزمن الذاتي لكل وحدة يجمع تحت حزمتها العليا (sqlalchemy.orm.* تحت sqlalchemy)
+    packages = {}
+    for match in IMPORTTIME.finditer(stderr):
+        self_us, _, name = match.groups()
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1000
+    return [[name, round(ms, 1)] for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:limit]]
+
+
+def measure(tree, rounds, limit):
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+               TEMPLATE_BYTECODE_DIR=os.path.join(tempfile.mkdtemp(), 'jinja_cache'))
+    env.pop('REDIS_URL', None)
+    samples = []
+    for _ in range(rounds):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE % (DEFERRED,)],
+                              cwd=tree, env=env, capture_output=True, text=True, check=True)
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample['packages'] = top_packages(proc.stderr, limit)
+        samples.append(sample)
+
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    first_ms = statistics.median(s['first_request_ms'] for s in samples)
+    return {'import_ms': round(import_ms, 1),
+            'first_request_ms': round(first_ms, 1),
+            'ready_ms': round(import_ms + first_ms, 1),
+            'deferred_loaded': samples[-1]['deferred_loaded'],
+            'top_packages_ms': samples[-1]['packages']}
+
+
+def export_tree(ref):
+    tree = tempfile.mkdtemp()
+    archive = os.path.join(tree, 'tree.tar')
+    subprocess.run(['git', 'archive', '-o', archive, ref], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(tree, filter='data')
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--top', type=int, default=12, help='heaviest packages to report')
+    parser.add_argument('--baseline', help='git ref to measure for comparison (e.g. HEAD~1)')
+    args = parser.parse_args()
+
+    results = {'python': sys.version.split()[0], 'rounds': args.rounds, 'trees': {}}
+    trees = [('current', ROOT)]
+    if args.baseline:
+        ref = subprocess.run(['git', 'rev-parse', '--short', args.baseline], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout.strip()
+        trees.insert(0, (ref, export_tree(ref)))
+    for label, tree in trees:
+        results['trees'][label] = measure(tree, args.rounds, args.top)
+        report = {k: v for k, v in results['trees'][label].items() if k != 'top_packages_ms'}
+        print(label, json.dumps(report))
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
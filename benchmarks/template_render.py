@@ -0,0 +1,131 @@
+# زمن ترجمة القوالب وزمن عرض لوحتي المالك والطالب، قبل وبعد ذاكرة الأجزاء وذاكرة bytecode
+#
+#   python benchmarks/template_render.py --staff 25 --requests 300
+#
+# يعمل داخل العملية على قاعدة SQLite مؤقتة: يقيس ترجمة كل القوالب بدون ذاكرة bytecode
+# ثم بقراءتها من القرص (ما يحدث لكل عامل بعد إعادة التشغيل)، ثم زمن render_template وحده
+# لكل لوحة مع تعطيل ذاكرة الأجزاء وتفعيلها، ويحفظ النتائج في benchmarks/results
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(TMP, 'bench.db')
+os.environ['TEMPLATE_BYTECODE_DIR'] = os.path.join(TMP, 'jinja_cache')
+os.environ['RATE_LIMIT_ENABLED'] = 'False'
+sys.path.insert(0, ROOT)
+
+from flask import before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache
+from wsgi import app
+from extensions import fragment_cache
+from models import db
+from models import User, Subject
+
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results', 'template_render.json')
+PAGES = {'owner': '/owner', 'student': '/student_dashboard'}
+
+
+def seed(staff):
+    with app.app_context():
+        db.create_all()
+        subject = Subject(class_level='first_intermediate', name='Math', code='BENCH')
+        db.session.add(subject)
+        db.session.flush()
+        users = [('owner', 'owner', None), ('student', 'student', 'first_intermediate')]
+        users += [(f'teacher{i}', 'teacher', None) for i in range(staff)]
+        users += [(f'tutor{i}', 'tutor', None) for i in range(staff)]
+        for i, (username, user_type, student_class) in enumerate(users):
+            u = User(first_name=username, last_name='x', email=username + '@bench.local', username=username,
+                     user_type=user_type, student_class=student_class, specialization='Math',
+                     subject_id=subject.id if user_type == 'teacher' else None,
+                     hourly_rate=10, rating=1 + i % 5)
+            u.set_password('benchmark')
+            db.session.add(u)
+        db.session.commit()
+
+
+def compile_times(rounds):
+    # بيئة جديدة في كل جولة (مثل عامل بدأ للتو)، بدون ذاكرة bytecode ثم معها
+    names = app.jinja_env.list_templates(extensions=['html'])
+    bytecode_cache = FileSystemBytecodeCache(os.environ['TEMPLATE_BYTECODE_DIR'])
+    bytecode_cache.clear()
+    warm = app.jinja_env.overlay(bytecode_cache=bytecode_cache, cache_size=len(names))
+    for name in names:
+        warm.get_template(name)
+
+    report = {'templates': len(names)}
+    for label, cache in (('without_bytecode_cache', None), ('with_bytecode_cache', bytecode_cache)):
+        samples = []
+        for _ in range(rounds):
+            env = app.jinja_env.overlay(bytecode_cache=cache, cache_size=len(names))
+            start = time.perf_counter()
+            for name in names:
+                env.get_template(name)
+            samples.append(time.perf_counter() - start)
+        report[label + '_ms'] = round(statistics.median(samples) * 1000, 2)
+    return report
+
+
+def render_times(client, path, requests):
+    # زمن القالب الرئيسي فقط: من إشارة before_render_template إلى template_rendered
+    samples, started = [], []
+
+    def before(sender, template, context, **extra):
+        started.append(time.perf_counter())
+
+    def after(sender, template, context, **extra):
+        samples.append(time.perf_counter() - started.pop())
+
+    before_render_template.connect(before, app)
+    template_rendered.connect(after, app)
+    try:
+        client.get(path)
+        samples.clear()
+        for _ in range(requests):
+            assert client.get(path).status_code == 200
+    finally:
+        before_render_template.disconnect(before, app)
+        template_rendered.disconnect(after, app)
+    samples.sort()
+    return {'p50_ms': round(samples[len(samples) // 2] * 1000, 3),
+            'p95_ms': round(samples[int(len(samples) * 0.95)] * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--staff', type=int, default=25, help='teachers and tutors each')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    seed(args.staff)
+    results = {'staff': args.staff, 'requests': args.requests, 'compile': compile_times(args.rounds), 'render': {}}
+    print('compile', json.dumps(results['compile']))
+
+    clients = {}
+    for role in PAGES:
+        clients[role] = app.test_client()
+        clients[role].post('/login', data={'identifier': role, 'password': 'benchmark'})
+    for role, path in PAGES.items():
+        report = {}
+        for label, enabled in (('without_fragment_cache', False), ('with_fragment_cache', True)):
+            fragment_cache.enabled = enabled
+            fragment_cache.clear()
+            report[label] = render_times(clients[role], path, args.requests)
+        results['render'][path] = report
+        print(path, json.dumps(report))
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# مقارنة أوضاع عمال gunicorn (sync / gthread / gevent) على صفحات لوحات التحكم
+#
+#   python benchmarks/wsgi_modes.py --modes sync gthread gevent --concurrency 16 --duration 10
+#
+# يشغل gunicorn بملف gunicorn.conf.py لكل وضع على قاعدة SQLite مؤقتة،
+# ويسجل الدخول كمالك وكطالب ثم يرسل الطلبات بالتوازي ويحفظ النتائج في benchmarks/results
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results', 'wsgi_modes.json')
+ROUTES = {
+    'owner': ['/owner'],
+    'student': ['/student_dashboard', '/student_courses', '/upcoming_lectures'],
+}
+
+
+def seed(db_url):
+    env = dict(os.environ, DATABASE_URL=db_url)
+    code = (
+        'from wsgi import app\n'
+        'from models import db\n'
+        'from models import User, Subject\n'
+        'with app.app_context():\n'
+        '    db.create_all()\n'
+        '    subject = Subject(class_level="first_intermediate", name="Math", code="BENCH")\n'
+        '    db.session.add(subject); db.session.flush()\n'
+        '    users = [("owner", "owner", None), ("student", "student", "first_intermediate")]\n'
+        '    users += [(f"teacher{i}", "teacher", None) for i in range(20)]\n'
+        '    users += [(f"tutor{i}", "tutor", None) for i in range(20)]\n'
+        '    for username, user_type, student_class in users:\n'
+        '        u = User(first_name=username, last_name="x", email=username + "@bench.local",\n'
+        '                 username=username, user_type=user_type, student_class=student_class,\n'
+        '                 subject_id=subject.id if user_type == "teacher" else None, rating=4.0)\n'
+        '        u.set_password("benchmark")\n'
+        '        db.session.add(u)\n'
+        '    db.session.commit()\n'
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True)
+
+
+def login(base, username):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    page = opener.open(base + '/login').read().decode()
+    token = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', page).group(1)
+    data = urllib.parse.urlencode({'csrf_token': token, 'identifier': username, 'password': 'benchmark'})
+    opener.open(base + '/login', data.encode())
+    return opener
+
+
+def run_load(base, concurrency, duration):
+    openers = {role: login(base, role) for role in ROUTES}
+    plan = [(role, path) for role, paths in ROUTES.items() for path in paths]
+    latencies = {path: [] for _, path in plan}
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            role, path = plan[i % len(plan)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                openers[role].open(base + path).read()
+                latencies[path].append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    def pct(values, p):
+        return round(values[min(int(len(values) * p), len(values) - 1)] * 1000, 1) if values else None
+
+    report = {}
+    for path, values in latencies.items():
+        values.sort()
+        report[path] = {'requests': len(values), 'p50_ms': pct(values, 0.5), 'p95_ms': pct(values, 0.95)}
+    total = sum(len(v) for v in latencies.values())
+    return {'throughput_rps': round(total / duration, 1), 'errors': len(errors), 'routes': report}
+
+
+def wait_ready(base, proc, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            urllib.request.urlopen(base + '/login', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', nargs='+', default=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db_url = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+    seed(db_url)
+
+    base = f'http://127.0.0.1:{args.port}'
+    results = {'cpus': os.cpu_count(), 'workers': args.workers, 'concurrency': args.concurrency,
+               'duration_s': args.duration, 'modes': {}}
+    for mode in args.modes:
+        env = dict(os.environ, DATABASE_URL=db_url, PORT=str(args.port), GUNICORN_WORKER_CLASS=mode,
+                   WEB_CONCURRENCY=str(args.workers))
+        proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                                 '--access-logfile', '/dev/null', 'wsgi:app'],
+                                cwd=ROOT, env=env, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready(base, proc)
+            results['modes'][mode] = run_load(base, args.concurrency, args.duration)
+            print(mode, json.dumps(results['modes'][mode]))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
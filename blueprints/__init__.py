@@ -0,0 +1,14 @@
+# مخططات المسارات: كل مجموعة صفحات في وحدة، وتسجل كلها في create_app
+from blueprints.main import bp as main
+from blueprints.auth import bp as auth
+from blueprints.owner import bp as owner
+from blueprints.student import bp as student
+from blueprints.teacher import bp as teacher
+from blueprints.api_v1 import bp as api_v1
+
+BLUEPRINTS = (main, auth, owner, student, teacher, api_v1)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
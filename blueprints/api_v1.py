@@ -0,0 +1,74 @@
+# واجهة JSON للقراءة فقط (تطبيق الجوال)، وكل مورد يدعم ?fields= و If-None-Match
+from flask import Blueprint, request
+from flask_login import current_user
+from blueprints.common import class_timetable, teacher_timetable
+from pagination import page_size
+import api
+import queries
+import student_summary
+
+bp = Blueprint('api', __name__, url_prefix=api.API_PREFIX)
+
+
+@bp.route('/dashboard')
+@api.api_login_required
+def dashboard():
+    if current_user.user_type == 'student':
+        summary = student_summary.get(current_user.id)
+        counters = {
+            'enrolled_courses': summary.enrolled_courses,
+            'completed_assignments': summary.completed_assignments,
+            'upcoming_lectures': summary.upcoming_lectures
+        }
+        version = (current_user.version, tuple(counters.values()),
+                   api.class_timetable_version(current_user.student_class))
+        return api.conditional(version, lambda: dict(
+            counters,
+            user=api.serialize_user(current_user),
+            timetable=api.serialize_grid(class_timetable(current_user.student_class))
+        ))
+
+    if current_user.user_type == 'teacher':
+        version = (current_user.version, api.teacher_timetable_version(current_user.id))
+        return api.conditional(version, lambda: {
+            'user': api.serialize_user(current_user),
+            'timetable': api.serialize_grid(teacher_timetable(current_user.id))
+        })
+
+    return api.error(403, 'forbidden')
+
+@bp.route('/teachers/<int:teacher_id>')
+@api.api_login_required
+def teacher(teacher_id):
+    row = api.user_version(teacher_id)
+    if row is None or row.user_type not in ['teacher', 'tutor']:
+        return api.error(404, 'not found')
+    return api.conditional((row.version, row.subject_id),
+                           lambda: api.serialize_user(queries.staff_by_ids([teacher_id])[0]))
+
+@bp.route('/teachers/<int:teacher_id>/timetable', endpoint='teacher_timetable')
+@api.api_login_required
+def teacher_timetable_resource(teacher_id):
+    return api.conditional(api.teacher_timetable_version(teacher_id),
+                           lambda: {'slots': api.serialize_grid(teacher_timetable(teacher_id))})
+
+@bp.route('/classes/<class_level>/timetable', endpoint='class_timetable')
+@api.api_login_required
+def class_timetable_resource(class_level):
+    return api.conditional(api.class_timetable_version(class_level),
+                           lambda: {'slots': api.serialize_grid(class_timetable(class_level))})
+
+@bp.route('/classes/<class_level>/students')
+@api.api_login_required
+def class_students(class_level):
+    if current_user.user_type not in ['teacher', 'owner']:
+        return api.error(403, 'forbidden')
+    return api.conditional(api.class_roster_version(class_level), lambda: api.serialize_page(
+        queries.students_in_class_page(
+            class_level,
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+            per_page=page_size()
+        ),
+        api.serialize_user
+    ))
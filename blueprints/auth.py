@@ -0,0 +1,172 @@
+# تسجيل الدخول والخروج وإنشاء الحساب واستعادة كلمة المرور
+from flask import Blueprint, current_app, render_template, redirect, url_for, request, flash
+from flask_login import login_user, login_required, logout_user
+from blueprints.common import allowed_file, invalidate_owner_cache, set_profile_image
+from extensions import cache, image_pipeline, login_manager, mail_queue, rate_limiter, user_cache
+from forms import LoginForm, RegistrationForm, ForgotPasswordForm, ResetPasswordForm
+from models import db, User, Subject, TeacherCode
+import reset_tokens
+
+bp = Blueprint('auth', __name__)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return user_cache.load(int(user_id))
+
+@bp.route('/login', methods=['GET', 'POST'])
+@rate_limiter.limit('login', lambda: request.form.get('identifier'))
+def login():
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter(
+            (User.email == form.identifier.data) | 
+            (User.username == form.identifier.data)
+        ).first()
+        
+        if user and user.check_password(form.password.data):
+            login_user(user)
+            flash('تم تسجيل الدخول بنجاح!', 'success')
+            return redirect(url_for('main.dashboard'))
+        else:
+            flash('بيانات الدخول غير صحيحة', 'danger')
+    return render_template('login.html', form=form)
+
+@bp.route('/forgot_password', methods=['GET', 'POST'])
+@rate_limiter.limit('forgot_password', lambda: request.form.get('email'))
+def forgot_password():
+    form = ForgotPasswordForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=form.email.data).first()
+        if user:
+            # توليد رمز مكون من 5 أرقام يستبدل أي رمز سابق للمستخدم
+            token = reset_tokens.issue(user.id)
+            
+            # إضافة البريد إلى طابور الإرسال بدل انتظار خادم SMTP داخل الطلب
+            mail_queue.send(
+                user.email,
+                'استعادة كلمة المرور - أكاديمية الرواد',
+                f'رمز استعادة كلمة المرور الخاص بك هو: {token}'
+            )
+            db.session.commit()
+            flash('تم إرسال رمز الاستعادة إلى بريدك الإلكتروني', 'success')
+            if not current_app.config['MAIL_USERNAME']:
+                flash(f'تم توليد الرمز: {token} (في بيئة التطوير)', 'info')
+            
+            return redirect(url_for('auth.reset_password', email=user.email))
+        else:
+            flash('البريد الإلكتروني غير مسجل', 'danger')
+    return render_template('forgot_password.html', form=form)
+
+@bp.route('/reset_password/<email>', methods=['GET', 'POST'])
+@rate_limiter.limit('reset_password', lambda: request.view_args['email'])
+def reset_password(email):
+    form = ResetPasswordForm()
+    user = User.query.filter_by(email=email).first()
+    
+    if not user:
+        flash('البريد الإلكتروني غير صحيح', 'danger')
+        return redirect(url_for('auth.forgot_password'))
+    
+    if form.validate_on_submit():
+        # مقارنة كلمتي المرور أولاً حتى لا يستهلك الرمز عند خطأ في الإدخال
+        if form.new_password.data != form.confirm_password.data:
+            flash('كلمات المرور غير متطابقة', 'danger')
+        elif reset_tokens.consume(user.id, form.token.data):
+            user.set_password(form.new_password.data)
+            db.session.commit()
+            flash('تم تحديث كلمة المرور بنجاح', 'success')
+            return redirect(url_for('auth.login'))
+        else:
+            flash('رمز الاستعادة غير صحيح أو منتهي الصلاحية', 'danger')
+    
+    return render_template('reset_password.html', form=form, email=email)
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    form = RegistrationForm()
+    form.subject_id.choices = [(s.id, s.name) for s in Subject.query.all()]
+    
+    if form.validate_on_submit():
+        # التحقق من تطابق كلمات المرور
+        if form.password.data != form.confirm_password.data:
+            flash('كلمات المرور غير متطابقة', 'danger')
+            return render_template('register.html', form=form)
+        
+        # التحقق من عدم وجود مستخدم بنفس البريد أو اسم المستخدم
+        existing_user = User.query.filter(
+            (User.email == form.email.data) | 
+            (User.username == form.username.data)
+        ).first()
+        
+        if existing_user:
+            flash('البريد الإلكتروني أو اسم المستخدم موجود مسبقاً', 'danger')
+            return render_template('register.html', form=form)
+        
+        # التحقق من كود المادة للمدرسين
+        if form.user_type.data == 'teacher':
+            teacher_code = form.teacher_code.data.strip()
+            if not teacher_code:
+                flash('يرجى إدخال كود المادة', 'danger')
+                return render_template('register.html', form=form)
+            
+            # البحث عن الكود في قاعدة البيانات
+            code_record = TeacherCode.query.filter_by(code=teacher_code).first()
+            
+            if not code_record:
+                flash('كود المادة غير صحيح', 'danger')
+                return render_template('register.html', form=form)
+                
+            if code_record.used:
+                flash('كود المادة مستخدم مسبقاً', 'danger')
+                return render_template('register.html', form=form)
+                
+            if code_record.subject_id != form.subject_id.data:
+                flash('كود المادة لا يتطابق مع المادة المختارة', 'danger')
+                return render_template('register.html', form=form)
+            
+            # تحديث حالة الكود إلى مستخدم
+            code_record.used = True
+        
+        # معالجة صورة الملف الشخصي
+        upload = None
+        if 'profile_image' in request.files:
+            file = request.files['profile_image']
+            if file and allowed_file(file.filename):
+                upload = image_pipeline.save_upload(file)
+        
+        # إنشاء المستخدم الجديد
+        user = User(
+            first_name=form.first_name.data,
+            last_name=form.last_name.data,
+            email=form.email.data,
+            username=form.username.data,
+            user_type=form.user_type.data,
+            student_class=form.student_class.data if form.user_type.data == 'student' else None,
+            specialization=form.specialization.data if form.user_type.data == 'tutor' else None,
+            hourly_rate=form.hourly_rate.data if form.user_type.data == 'tutor' else None,
+            subject_id=form.subject_id.data if form.user_type.data == 'teacher' else None
+        )
+        user.set_password(form.password.data)
+        
+        db.session.add(user)
+        db.session.commit()
+        invalidate_owner_cache('stats', 'teachers', 'tutors', 'codes', 'teacher_choices')
+        cache.delete('dashboard:staff')
+        if upload:
+            # الصورة تعالج في الخلفية، ويحفظ للمستخدم مفتاح مشتق من محتواها بعد توليد نسخها
+            user_id = user.id
+            image_pipeline.process(upload, lambda image_key: set_profile_image(user_id, image_key))
+        
+        # تسجيل الدخول تلقائياً بعد إنشاء الحساب
+        login_user(user)
+        flash('تم إنشاء الحساب بنجاح!', 'success')
+        return redirect(url_for('main.dashboard'))
+    
+    return render_template('register.html', form=form)
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('main.index'))
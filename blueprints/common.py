@@ -0,0 +1,177 @@
+# دوال مشتركة بين المخططات: بيانات اللوحات المخزنة مؤقتاً، والجداول، وأسماء الصفوف
+from functools import wraps
+from flask import current_app, request, jsonify
+from flask_login import current_user
+from sqlalchemy import func, update
+from extensions import cache, user_cache
+from forms import StaffSearchForm
+from models import db, User, Subject
+import queries
+import timetable
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+def get_class_in_arabic(class_name):
+    class_map = {
+        'first_intermediate': 'الأول متوسط',
+        'second_intermediate': 'الثاني متوسط',
+        'third_intermediate': 'الثالث متوسط',
+        'fourth_science': 'الرابع علمي',
+        'fourth_literature': 'الرابع أدبي',
+        'fifth_science': 'الخامس علمي',
+        'fifth_literature': 'الخامس أدبي',
+        'sixth_science': 'السادس علمي',
+        'sixth_literature': 'السادس أدبي'
+    }
+    return class_map.get(class_name, class_name)
+
+def add_teacher_rating(teacher_id, value):
+    # تحديث المجموع والعدد والمتوسط بعبارة UPDATE واحدة بدل تحميل كل التقييمات
+    rating_sum = func.coalesce(User.rating_sum, 0) + value
+    rating_count = func.coalesce(User.rating_count, 0) + 1
+    db.session.execute(
+        update(User)
+        .where(User.id == teacher_id)
+        .values(rating_sum=rating_sum, rating_count=rating_count, rating=rating_sum / rating_count,
+                version=User.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    # التحديث المباشر لا يمر بأحداث ORM، فنطلب إلغاء نسخة المدرس المخزنة عند الحفظ
+    user_cache.changed(teacher_id)
+
+def set_profile_image(user_id, image_key):
+    # يستدعيها عامل الصور بعد كتابة كل النسخ المصغرة، فلا يحمل المستخدم مفتاحاً بلا ملفات
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(image=image_key, version=User.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    user_cache.changed(user_id)
+    db.session.commit()
+    cache.delete('dashboard:staff')
+
+# الإلغاء يصل إلى كل العمال عبر Redis فقط، ونسخة LRU لا يحذفها إلا العامل الذي حفظ التعديل،
+# فكل ما يلغى عند التعديل (لوحة المالك، بطاقات المدرسين، الجداول) يبقى فيها LOCAL_TTL ثوانٍ
+# حتى لا يعرض عامل آخر بيانات قديمة بعد التحويل (post/redirect/get)
+LOCAL_TTL = 5
+
+# بيانات لوحة المالك تخزن مؤقتاً كقواميس بسيطة حتى يمكن حفظها في Redis
+def load_owner_stats():
+    rows = db.session.execute(
+        db.select(User.user_type, func.count(User.id)).group_by(User.user_type)
+    ).all()
+    return {user_type: count for user_type, count in rows}
+
+def load_owner_staff(user_type, after=None, before=None):
+    return queries.staff_page(user_type, after, before).map(lambda u: {
+        'id': u.id,
+        'version': u.version,
+        'first_name': u.first_name,
+        'last_name': u.last_name,
+        'specialization': u.specialization,
+        'rating': u.rating or 0.0,
+        'subject': {'name': u.subject.name} if u.subject else None
+    })
+
+def load_owner_subjects():
+    return [{
+        'id': s.id,
+        'class_level': s.class_level,
+        'name': s.name,
+        'code': s.code
+    } for s in Subject.query.all()]
+
+def load_owner_teacher_choices():
+    rows = db.session.execute(
+        db.select(User.id, User.first_name, User.last_name)
+        .filter_by(user_type='teacher').order_by(User.first_name, User.id)
+    ).all()
+    return [(teacher_id, f'{first_name} {last_name}') for teacher_id, first_name, last_name in rows]
+
+def load_owner_codes(after=None, before=None):
+    return queries.teacher_codes_page(after, before).map(lambda c: {
+        'code': c.code,
+        'subject': {'name': c.subject.name},
+        'used': c.used,
+        'created_at': c.created_at
+    })
+
+def owner_list(part, loader):
+    # الصفحة الأولى فقط تخزن مؤقتاً، والصفحات التالية تقرأ مباشرة بالمؤشر
+    after = request.args.get(part + '_after')
+    before = request.args.get(part + '_before')
+    if after or before:
+        return loader(after=after, before=before)
+    return cache.get_or_set('owner:' + part, loader, local_ttl=LOCAL_TTL)
+
+def invalidate_owner_cache(*parts):
+    cache.delete(*['owner:' + part for part in parts])
+
+# الجداول الأسبوعية تحسب مرة لكل صف ولكل مدرس وتبقى مخزنة حتى يتغير الجدول
+TIMETABLE_TTL = 24 * 3600
+
+def class_timetable(class_level):
+    return cache.get_or_set('timetable:class:' + class_level,
+                            lambda: timetable.class_grid(class_level), TIMETABLE_TTL, local_ttl=LOCAL_TTL)
+
+def teacher_timetable(teacher_id):
+    return cache.get_or_set(f'timetable:teacher:{teacher_id}',
+                            lambda: timetable.teacher_grid(teacher_id), TIMETABLE_TTL, local_ttl=LOCAL_TTL)
+
+def invalidate_timetables(class_levels=(), teacher_ids=()):
+    cache.delete(*['timetable:class:' + level for level in class_levels],
+                 *[f'timetable:teacher:{teacher_id}' for teacher_id in teacher_ids])
+
+# بطاقات المدرسين في لوحة الطالب مشتركة بين كل الطلاب فتخزن مؤقتاً كقواميس
+def load_dashboard_staff():
+    def card(u):
+        return {
+            'id': u.id,
+            'version': u.version,
+            'first_name': u.first_name,
+            'last_name': u.last_name,
+            'image': u.image,
+            'specialization': u.specialization,
+            'hourly_rate': u.hourly_rate,
+            'rating': u.rating or 0.0,
+            'subject': {'name': u.subject.name} if u.subject else None
+        }
+    return {
+        'teachers': [card(u) for u in queries.staff_with_subject('teacher', limit=5)],
+        'tutors': [card(u) for u in queries.staff_with_subject('tutor', limit=5)]
+    }
+
+def staff_filter_form():
+    # مرشحات البحث وترتيب المدرسين تقرأ من عنوان الطلب
+    form = StaffSearchForm(request.args)
+    form.subject_id.choices = [(0, 'كل المواد')] + [
+        (s['id'], f"{s['name']} - {get_class_in_arabic(s['class_level'])}")
+        for s in cache.get_or_set('owner:subjects', load_owner_subjects, local_ttl=LOCAL_TTL)
+    ]
+    return form
+
+def leaderboard_board(user_type=None, subject_id=None, class_level=None):
+    # اللوحة (أو اللوحات المنفصلة التي يجمعها leaderboard.top) المقابلة لمرشحات صفحة البحث.
+    # لوحات المواد والصفوف لمدرسي المعهد فقط، والمدرس الخصوصي يدرس كل الصفوف ولا مادة له،
+    # فيعاد None للمدرس الخصوصي مع مادة لأنه لا توجد نتائج يمكن ترتيبها
+    if subject_id:
+        return None if user_type == 'tutor' else f'subject:{subject_id}'
+    if class_level:
+        if user_type == 'tutor':
+            return 'type:tutor'
+        return f'class:{class_level}' if user_type == 'teacher' else (f'class:{class_level}', 'type:tutor')
+    return f'type:{user_type}' if user_type else ('type:teacher', 'type:tutor')
+
+def internal_only(view):
+    # نقاط المراقبة الداخلية: متاحة للمالك أو للطلبات من داخل الخادم نفسه
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        is_local = request.remote_addr in ('127.0.0.1', '::1')
+        is_owner = current_user.is_authenticated and current_user.user_type == 'owner'
+        if not (is_local or is_owner):
+            return jsonify({'error': 'forbidden'}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,42 @@
+# الصفحات العامة، والتوجيه إلى لوحة كل نوع مستخدم، ونقاط المراقبة الداخلية
+from flask import Blueprint, render_template, redirect, url_for, jsonify
+from flask_login import login_required, current_user
+from blueprints.common import internal_only
+from extensions import metrics, page_cache
+from models import db
+import db_pool
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/')
+@page_cache.cached
+def index():
+    return render_template('index.html')
+
+@bp.route('/terms')
+@page_cache.cached
+def terms():
+    return render_template('terms.html')
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    if current_user.user_type == 'student':
+        return redirect(url_for('student.student_dashboard'))
+    elif current_user.user_type == 'teacher':
+        return redirect(url_for('teacher.teacher_dashboard'))
+    elif current_user.user_type == 'owner':
+        return redirect(url_for('owner.owner_panel'))
+    return render_template('dashboard.html', user=current_user)
+
+@bp.route('/internal/db_pool')
+@internal_only
+def db_pool_status():
+    return jsonify(db_pool.pool_status(db.engine))
+
+@bp.route('/metrics', endpoint='metrics')
+@internal_only
+def metrics_endpoint():
+    # قياسات الأداء بصيغة Prometheus (لكل عامل gunicorn على حدة)
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
@@ -0,0 +1,225 @@
+# لوحة المالك: المواد والجداول وأكواد المدرسين واستيراد الطلاب
+import os
+import secrets
+from datetime import datetime, timezone
+from flask import (Blueprint, Response, render_template, redirect, url_for, request, flash, jsonify,
+                   send_file, stream_with_context)
+from flask_login import login_required, current_user
+from sqlalchemy.exc import IntegrityError
+from blueprints.common import (get_class_in_arabic, load_owner_subjects, load_owner_teacher_choices,
+                               load_owner_stats, load_owner_staff, load_owner_codes, owner_list,
+                               invalidate_owner_cache, invalidate_timetables, LOCAL_TTL)
+from extensions import cache, student_import
+from forms import SubjectForm, ScheduleForm, StudentImportForm
+from models import db, User, Subject, TeacherCode
+import teacher_codes
+import timetable
+
+bp = Blueprint('owner', __name__)
+
+
+@bp.route('/owner', methods=['GET', 'POST'])
+@login_required
+def owner_panel():
+    if current_user.user_type != 'owner':
+        flash('غير مصرح بالدخول لهذه الصفحة', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    subject_form = SubjectForm()
+    schedule_form = ScheduleForm()
+    subjects = cache.get_or_set('owner:subjects', load_owner_subjects, local_ttl=LOCAL_TTL)
+    schedule_form.set_choices(
+        [(s['id'], s['class_level'], f"{s['name']} - {get_class_in_arabic(s['class_level'])}") for s in subjects],
+        cache.get_or_set('owner:teacher_choices', load_owner_teacher_choices, local_ttl=LOCAL_TTL)
+    )
+    
+    if subject_form.validate_on_submit():
+        # توليد كود عشوائي للمادة
+        subject_code = secrets.token_hex(3).upper()
+        new_subject = Subject(
+            class_level=subject_form.class_level.data,
+            name=subject_form.subject_name.data,
+            code=subject_code
+        )
+        db.session.add(new_subject)
+        db.session.commit()
+        invalidate_owner_cache('subjects')
+        flash(f'تم إضافة المادة بنجاح - الكود: {subject_code}', 'success')
+        return redirect(url_for('owner.owner_panel'))
+    
+    if schedule_form.validate_on_submit():
+        # حفظ اليوم يحدث حصص الصف الموجودة بدل إضافة جدول جديد في كل مرة
+        class_level = schedule_form.class_level.data
+        try:
+            teacher_ids = timetable.save_day(class_level, schedule_form.day.data, schedule_form.periods())
+        except timetable.DoubleBooking as e:
+            for period, teacher, booked_class in e.conflicts:
+                flash(f'الحصة {period}: المدرس {teacher} لديه حصة في {get_class_in_arabic(booked_class)}', 'danger')
+            return redirect(url_for('owner.owner_panel'))
+        except IntegrityError:
+            # حفظ متزامن من جلسة أخرى أخذ الحصة نفسها (أو المدرس نفسه) بعد الفحص وقبل الحفظ
+            db.session.rollback()
+            flash('تعذر حفظ الجدول لأنه عدل في الوقت نفسه، يرجى المحاولة مرة أخرى', 'danger')
+            return redirect(url_for('owner.owner_panel'))
+        invalidate_timetables([class_level], teacher_ids)
+        flash('تم حفظ الجدول بنجاح', 'success')
+        return redirect(url_for('owner.owner_panel'))
+    
+    stats = cache.get_or_set('owner:stats', load_owner_stats, local_ttl=LOCAL_TTL)
+    teachers = owner_list('teachers', lambda **kw: load_owner_staff('teacher', **kw))
+    tutors = owner_list('tutors', lambda **kw: load_owner_staff('tutor', **kw))
+    teacher_codes = owner_list('codes', load_owner_codes)
+    
+    return render_template('owner.html', 
+                         subject_form=subject_form,
+                         schedule_form=schedule_form,
+                         teachers=teachers,
+                         tutors=tutors,
+                         subjects=subjects,
+                         teacher_codes=teacher_codes,
+                         total_students=stats.get('student', 0),
+                         total_teachers=stats.get('teacher', 0),
+                         total_tutors=stats.get('tutor', 0))
+
+@bp.route('/generate_teacher_code/<int:subject_id>', methods=['POST'])
+@login_required
+def generate_teacher_code(subject_id):
+    if current_user.user_type != 'owner':
+        return jsonify({'success': False, 'error': 'غير مصرح بهذا الإجراء'}), 403
+    
+    subject = db.session.get(Subject, subject_id)
+    if not subject:
+        return jsonify({'success': False, 'error': 'المادة غير موجودة'}), 404
+    
+    # توليد كود عشوائي فريد وحفظه في قاعدة البيانات
+    code = teacher_codes.generate_codes([subject_id], 1)[0]['code']
+    invalidate_owner_cache('codes')
+    
+    return jsonify({'success': True, 'code': code})
+
+@bp.route('/generate_teacher_codes', methods=['POST'])
+@login_required
+def generate_teacher_codes():
+    # توليد دفعة من الأكواد لمادة واحدة أو لكل المواد في معاملة واحدة
+    if current_user.user_type != 'owner':
+        return jsonify({'success': False, 'error': 'غير مصرح بهذا الإجراء'}), 403
+    
+    data = request.get_json(silent=True) or request.form
+    try:
+        count = int(data.get('count', 0))
+        subject_id = int(data.get('subject_id') or 0)
+    except (TypeError, ValueError):
+        count = subject_id = 0
+    if not 1 <= count <= 500:
+        return jsonify({'success': False, 'error': 'عدد الأكواد يجب أن يكون بين 1 و 500'}), 400
+    
+    if subject_id:
+        subject = db.session.get(Subject, subject_id)
+        if not subject:
+            return jsonify({'success': False, 'error': 'المادة غير موجودة'}), 404
+        subject_ids = [subject.id]
+    else:
+        subject_ids = list(db.session.scalars(db.select(Subject.id).order_by(Subject.id)))
+    
+    try:
+        rows = teacher_codes.generate_codes(subject_ids, count)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'عدد الأكواد المطلوب أكبر من الحد المسموح'}), 400
+    invalidate_owner_cache('codes')
+    
+    return jsonify({'success': True, 'count': len(rows),
+                    'codes': [{'code': r['code'], 'subject_id': r['subject_id']} for r in rows]})
+
+@bp.route('/export_teacher_codes')
+@login_required
+def export_teacher_codes():
+    if current_user.user_type != 'owner':
+        flash('غير مصرح بهذا الإجراء', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    rows = teacher_codes.export_rows(request.args.get('subject_id', type=int),
+                                     unused_only=request.args.get('unused') == '1')
+    filename = f"teacher_codes_{datetime.now(timezone.utc):%Y%m%d}"
+    if request.args.get('format') == 'xlsx':
+        return send_file(teacher_codes.xlsx_file(rows), as_attachment=True, download_name=filename + '.xlsx',
+                         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    return Response(stream_with_context(teacher_codes.csv_stream(rows)), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}.csv'})
+
+@bp.route('/import_students', methods=['GET', 'POST'])
+@login_required
+def import_students():
+    if current_user.user_type != 'owner':
+        flash('غير مصرح بالدخول لهذه الصفحة', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    form = StudentImportForm()
+    if form.validate_on_submit():
+        # الملف يحفظ ويعالج في الخلفية، والصفحة تتابع التقدم برقم المهمة
+        job_id = student_import.start(form.file.data, on_complete=lambda: invalidate_owner_cache('stats'))
+        return redirect(url_for('owner.import_students', job=job_id))
+    
+    return render_template('import_students.html', form=form, job_id=request.args.get('job'))
+
+@bp.route('/import_students/<job_id>')
+@login_required
+def import_students_status(job_id):
+    if current_user.user_type != 'owner':
+        return jsonify({'error': 'forbidden'}), 403
+    status = student_import.status(job_id)
+    if status is None:
+        return jsonify({'error': 'not found'}), 404
+    return jsonify(status)
+
+@bp.route('/import_students/<job_id>/errors.csv')
+@login_required
+def import_students_report(job_id):
+    if current_user.user_type != 'owner' or not job_id.isalnum():
+        return redirect(url_for('main.dashboard'))
+    _, report_path = student_import.paths(job_id)
+    if not os.path.exists(report_path):
+        flash('تقرير الأخطاء غير متوفر', 'danger')
+        return redirect(url_for('owner.import_students'))
+    return send_file(report_path, mimetype='text/csv', as_attachment=True,
+                     download_name=f'import-errors-{job_id}.csv')
+
+@bp.route('/delete_teacher/<int:teacher_id>', methods=['POST'])
+@login_required
+def delete_teacher(teacher_id):
+    if current_user.user_type != 'owner':
+        flash('غير مصرح بهذا الإجراء', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    teacher = db.session.get(User, teacher_id)
+    if teacher and teacher.user_type in ['teacher', 'tutor']:
+        # حصص المدرس تبقى في جداول الصفوف بدون مدرس
+        class_levels = timetable.unassign_teacher(teacher_id)
+        db.session.delete(teacher)
+        db.session.commit()
+        invalidate_owner_cache('stats', 'teachers', 'tutors', 'teacher_choices')
+        cache.delete('dashboard:staff')
+        invalidate_timetables(class_levels, [teacher_id])
+        flash('تم حذف الأستاذ بنجاح', 'success')
+    return redirect(url_for('owner.owner_panel'))
+
+@bp.route('/delete_subject/<int:subject_id>', methods=['POST'])
+@login_required
+def delete_subject(subject_id):
+    if current_user.user_type != 'owner':
+        flash('غير مصرح بهذا الإجراء', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    subject = db.session.get(Subject, subject_id)
+    if subject:
+        # حذف جميع الأكواد والحصص المرتبطة بالمادة
+        TeacherCode.query.filter_by(subject_id=subject_id).delete()
+        class_levels, teacher_ids = timetable.remove_subject(subject_id)
+        
+        # حذف المادة
+        db.session.delete(subject)
+        db.session.commit()
+        invalidate_owner_cache('subjects', 'codes', 'teachers')
+        cache.delete('dashboard:staff')
+        invalidate_timetables(class_levels, teacher_ids)
+        flash('تم حذف المادة بنجاح', 'success')
+    return redirect(url_for('owner.owner_panel'))
@@ -0,0 +1,168 @@
+# صفحات الطالب: اللوحة والبحث عن المدرسين والترتيب والتقييم وقوائم المقررات
+from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask_login import login_required, current_user
+from blueprints.common import (add_teacher_rating, class_timetable, invalidate_owner_cache, leaderboard_board,
+                               load_dashboard_staff, staff_filter_form, LOCAL_TTL)
+from extensions import cache, leaderboard
+from models import db, User, Rating
+from pagination import page_size
+import queries
+import staff_search
+import student_summary
+
+bp = Blueprint('student', __name__)
+
+
+@bp.route('/student_dashboard')
+@login_required
+def student_dashboard():
+    if current_user.user_type != 'student':
+        flash('غير مصرح بالدخول لهذه الصفحة', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    # العدادات الثلاثة محسوبة مسبقاً وتقرأ بالمفتاح الأساسي
+    summary = student_summary.get(current_user.id)
+    staff = cache.get_or_set('dashboard:staff', load_dashboard_staff, local_ttl=LOCAL_TTL)
+    
+    return render_template('student_dashboard.html',
+                         timetable=class_timetable(current_user.student_class),
+                         enrolled_courses=summary.enrolled_courses,
+                         completed_assignments=summary.completed_assignments,
+                         upcoming_lectures=summary.upcoming_lectures,
+                         institute_teachers=staff['teachers'],
+                         private_tutors=staff['tutors'])
+
+@bp.route('/search_staff')
+@login_required
+def search_staff():
+    form = staff_filter_form()
+    # الطالب يرى مدرسي صفه افتراضياً
+    if 'class_level' not in request.args and current_user.user_type == 'student':
+        form.class_level.data = current_user.student_class
+
+    results = []
+    if form.validate():
+        results = staff_search.search(
+            form.q.data,
+            user_type=form.user_type.data or None,
+            subject_id=form.subject_id.data or None,
+            class_level=form.class_level.data or None
+        )
+    return render_template('search_staff.html', form=form, results=results)
+
+@bp.route('/leaderboard', endpoint='leaderboard')
+@login_required
+def leaderboard_page():
+    # أفضل المدرسين حسب النقاط البايزية، مع نفس مرشحات صفحة البحث
+    form = staff_filter_form()
+    rows = []
+    if form.validate():
+        board = leaderboard_board(form.user_type.data, form.subject_id.data, form.class_level.data)
+        if board is None:
+            flash('المدرسون الخصوصيون غير مرتبطين بمادة، اختر مدرسي المعهد أو كل المواد', 'warning')
+        else:
+            top = leaderboard.top(board, limit=50)
+            users = {u.id: u for u in queries.staff_by_ids([teacher_id for teacher_id, _ in top])}
+            rows = [(position, users[teacher_id], score)
+                    for position, (teacher_id, score) in enumerate(top, 1) if teacher_id in users]
+    return render_template('leaderboard.html', form=form, rows=rows)
+
+@bp.route('/teacher_profile/<int:teacher_id>', methods=['GET', 'POST'])
+@login_required
+def teacher_profile(teacher_id):
+    teacher = db.session.get(User, teacher_id)
+    if not teacher or teacher.user_type not in ['teacher', 'tutor']:
+        flash('المدرس غير موجود', 'danger')
+        return redirect(url_for('student.student_dashboard'))
+    
+    # التحقق مما إذا كان الطالب قد قام بتقييم هذا المدرس بالفعل
+    already_rated = False
+    existing_rating = None
+    
+    if current_user.is_authenticated and current_user.user_type == 'student':
+        existing_rating = Rating.query.filter_by(
+            teacher_id=teacher_id,
+            student_id=current_user.id
+        ).first()
+        already_rated = existing_rating is not None
+    
+    if request.method == 'POST' and not already_rated:
+        rating_value = request.form.get('rating')
+        comment = request.form.get('comment', '')
+        
+        if rating_value and rating_value.isdigit():
+            rating_value = int(rating_value)
+            if 1 <= rating_value <= 5:
+                new_rating = Rating(
+                    teacher_id=teacher_id,
+                    student_id=current_user.id,
+                    rating=rating_value,
+                    comment=comment
+                )
+                db.session.add(new_rating)
+                
+                # تحديث متوسط تقييم المدرس
+                add_teacher_rating(teacher_id, rating_value)
+                
+                db.session.commit()
+                invalidate_owner_cache('tutors')
+                cache.delete('dashboard:staff')
+                flash('شكراً لتقييمك!', 'success')
+                return redirect(url_for('student.teacher_profile', teacher_id=teacher_id))
+    
+    ratings = queries.teacher_reviews(teacher_id, request.args.get('page', 1, type=int))
+    # ترتيب المدرس بين مدرسي مادته، أو بين المدرسين الخصوصيين
+    rank_args = {'subject_id': teacher.subject_id} if teacher.subject_id else {'user_type': teacher.user_type}
+    rank = leaderboard.rank(teacher_id, leaderboard_board(**rank_args))
+    
+    return render_template('teacher_profile.html', 
+                          teacher=teacher, 
+                          already_rated=already_rated,
+                          ratings=ratings,
+                          rank=rank,
+                          rank_args=rank_args)
+
+@bp.route('/student_courses')
+@login_required
+def student_courses():
+    if current_user.user_type != 'student':
+        return redirect(url_for('main.dashboard'))
+    
+    courses = queries.student_enrollments(
+        current_user.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=page_size()
+    )
+    
+    return render_template('student_courses.html', courses=courses)
+
+@bp.route('/completed_assignments')
+@login_required
+def completed_assignments():
+    if current_user.user_type != 'student':
+        return redirect(url_for('main.dashboard'))
+    
+    assignments = queries.completed_submissions(
+        current_user.id,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=page_size()
+    )
+    
+    return render_template('completed_assignments.html', assignments=assignments)
+
+@bp.route('/upcoming_lectures')
+@login_required
+def upcoming_lectures():
+    if current_user.user_type != 'student':
+        return redirect(url_for('main.dashboard'))
+    
+    lectures = queries.upcoming_lectures(
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=page_size(),
+        student_id=current_user.id
+    )
+    
+    return render_template('upcoming_lectures.html', lectures=lectures)
@@ -0,0 +1,52 @@
+# صفحات المدرس: اللوحة وطلاب كل صف وملف الطالب
+from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask_login import login_required, current_user
+from blueprints.common import teacher_timetable
+from models import db, User
+from pagination import page_size
+import queries
+
+bp = Blueprint('teacher', __name__)
+
+
+@bp.route('/teacher_dashboard')
+@login_required
+def teacher_dashboard():
+    if current_user.user_type != 'teacher':
+        flash('غير مصرح بالدخول لهذه الصفحة', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    classes = ['first_intermediate', 'second_intermediate', 'third_intermediate',
+              'fourth_science', 'fourth_literature', 'fifth_science',
+              'fifth_literature', 'sixth_science', 'sixth_literature']
+    
+    return render_template('teacher_dashboard.html', classes=classes,
+                         timetable=teacher_timetable(current_user.id))
+
+@bp.route('/teacher_class/<class_level>')
+@login_required
+def teacher_class(class_level):
+    if current_user.user_type != 'teacher':
+        flash('غير مصرح بالدخول لهذه الصفحة', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    students = queries.students_in_class_page(
+        class_level,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=page_size()
+    )
+    
+    return render_template('teacher_class.html', 
+                          class_level=class_level,
+                          students=students)
+
+@bp.route('/student_profile/<int:student_id>')
+@login_required
+def student_profile(student_id):
+    student = db.session.get(User, student_id)
+    if not student or student.user_type != 'student':
+        flash('الطالب غير موجود', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    return render_template('student_profile.html', student=student)
@@ -0,0 +1,136 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+# ذاكرة مؤقتة داخل العملية (LRU مع مدة صلاحية) تستخدم عند غياب Redis
+class LRUCache:
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# ذاكرة مؤقتة للقراءة (read-through) فوق Redis مع الرجوع إلى LRU عند تعذر الاتصال
+class Cache:
+    def __init__(self, app=None, client=None):
+        self.client = None
+        self.local = LRUCache()
+        self.default_ttl = 60
+        self.prefix = ''
+        self.logger = None
+        self._retry_at = 0
+        if app is not None:
+            self.init_app(app, client)
+
+    def init_app(self, app, client=None):
+        app.config.setdefault('REDIS_URL', os.environ.get('REDIS_URL'))
+        app.config.setdefault('CACHE_DEFAULT_TTL', int(os.environ.get('CACHE_DEFAULT_TTL', 60)))
+        app.config.setdefault('CACHE_KEY_PREFIX', 'academy:')
+        app.config.setdefault('CACHE_LRU_SIZE', 1024)
+
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        self.prefix = app.config['CACHE_KEY_PREFIX']
+        self.local = LRUCache(app.config['CACHE_LRU_SIZE'])
+        self.logger = app.logger
+
+        # يمكن تمرير عميل جاهز (مثل fakeredis في الاختبارات)
+        if client is not None:
+            self.client = client
+        elif app.config['REDIS_URL']:
+            import redis
+            self.client = redis.Redis.from_url(app.config['REDIS_URL'],
+                                               socket_connect_timeout=0.5,
+                                               socket_timeout=0.5)
+        app.extensions['cache'] = self
+
+    @property
+    def errors(self):
+        # أخطاء Redis التي تعني الرجوع إلى LRU. مكتبة redis تحمل فقط عند وجود عميل،
+        # وبدونه لا توجد أخطاء لالتقاطها
+        if self.client is None:
+            return ()
+        import redis
+        return (redis.RedisError,)
+
+    def redis(self):
+        # بعد فشل الاتصال نتجاوز Redis لمدة قصيرة حتى لا ندفع مهلة الاتصال في كل طلب.
+        # عامة حتى تستخدمها مكونات أخرى تحتاج أوامر Redis مباشرة (مثل ترتيب المدرسين)
+        if self.client is None or time.monotonic() < self._retry_at:
+            return None
+        return self.client
+
+    def redis_failed(self, error):
+        if self.logger is not None:
+            self.logger.warning('Redis unavailable, using local cache for 30 s: %s', error)
+        self._retry_at = time.monotonic() + 30
+
+    def get(self, key):
+        client = self.redis()
+        if client is not None:
+            try:
+                raw = client.get(self.prefix + key)
+                return pickle.loads(raw) if raw is not None else None
+            except self.errors as e:
+                self.redis_failed(e)
+        return self.local.get(key)
+
+    def set(self, key, value, ttl=None, local_ttl=None):
+        # local_ttl: مدة أقصر للنسخة في LRU، لأن الحذف منها لا يصل إلى العمال الآخرين
+        ttl = ttl or self.default_ttl
+        client = self.redis()
+        if client is not None:
+            try:
+                client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+                return
+            except self.errors as e:
+                self.redis_failed(e)
+        self.local.set(key, value, min(ttl, local_ttl or ttl))
+
+    def delete(self, *keys):
+        # الحذف من المخزنين معاً حتى لا تبقى نسخة قديمة في LRU بعد عودة Redis
+        self.local.delete(*keys)
+        client = self.redis()
+        if client is not None and keys:
+            try:
+                client.delete(*[self.prefix + key for key in keys])
+            except self.errors as e:
+                self.redis_failed(e)
+
+    def get_or_set(self, key, loader, ttl=None, local_ttl=None):
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.set(key, value, ttl, local_ttl=local_ttl)
+        return value
@@ -0,0 +1,122 @@
+# أوامر سطر الأوامر (flask --app app ...). الوحدات التي تحتاجها الأوامر وحدها
+# (توليد البيانات وفحص الخطط والاستيراد) تستورد داخل الأمر، فلا يحملها عامل الويب
+import click
+from sqlalchemy import func, update
+from blueprints.common import invalidate_owner_cache
+from extensions import cache, leaderboard, mail_queue, user_cache
+from models import db, User, Rating
+import reset_tokens
+import staff_search
+import student_summary
+
+
+def register_commands(app):
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings():
+        # إعادة بناء تجميعات التقييم لكل المدرسين باستعلام GROUP BY واحد
+        totals = db.session.execute(
+            db.select(Rating.teacher_id, func.sum(Rating.rating), func.count(Rating.id))
+            .group_by(Rating.teacher_id)
+        ).all()
+
+        # التصفير يشمل كل المدرسين، فتلغى نسخهم المخزنة كلها (لا من بقيت لهم تقييمات فقط)
+        staff = User.user_type.in_(['teacher', 'tutor'])
+        user_cache.changed(*db.session.scalars(db.select(User.id).where(staff)))
+        db.session.execute(
+            update(User)
+            .where(staff)
+            .values(rating=0.0, rating_sum=0.0, rating_count=0, version=User.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if totals:
+            db.session.execute(update(User), [
+                {'id': teacher_id, 'rating_sum': total, 'rating_count': count, 'rating': total / count}
+                for teacher_id, total, count in totals
+            ])
+        db.session.commit()
+        leaderboard.rebuild()
+        print(f'Rebuilt ratings for {len(totals)} teachers')
+
+    @app.cli.command('check-indexes')
+    def check_indexes():
+        # التحقق عبر EXPLAIN من أن الاستعلامات المتكررة تستخدم الفهارس
+        import query_plans
+        failures = query_plans.check_hot_queries()
+        for name, plan in failures.items():
+            print(f'{name}: full scan')
+            for line in plan:
+                print(f'    {line}')
+        if failures:
+            raise SystemExit(1)
+        print('All hot queries use an index')
+
+    @app.cli.command('seed')
+    @click.option('--students', default=50000)
+    @click.option('--teachers', default=200)
+    @click.option('--tutors', default=2000)
+    @click.option('--ratings-per-tutor', default=10)
+    @click.option('--courses-per-student', default=5)
+    @click.option('--lectures-per-course', default=20)
+    @click.option('--assignments-per-course', default=10)
+    @click.option('--submissions-per-student', default=5)
+    @click.option('--seed', 'seed_value', default=42)
+    def seed_command(**options):
+        # توليد بيانات تجريبية بالحجم المطلوب (كلمة مرور كل الحسابات: password)
+        import seed_data
+        counts = seed_data.seed(**options)
+        counts['student_summaries'] = student_summary.rebuild()
+        counts['search_index'] = staff_search.rebuild()
+        counts['leaderboard'] = leaderboard.rebuild()
+        invalidate_owner_cache('stats', 'teachers', 'tutors', 'subjects', 'codes', 'teacher_choices')
+        cache.delete('dashboard:staff')
+        for name, count in counts.items():
+            print(f'{name}: {count}')
+
+    @app.cli.command('import-students')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--report', default='import-errors.csv', help='per-row error report')
+    @click.option('--workers', type=int, help='password hashing processes (default: CPU count)')
+    def import_students_command(path, report, workers):
+        # استيراد ملف طلاب كبير مباشرة من سطر الأوامر مع طباعة التقدم
+        from student_import import import_students as run_student_import
+        def progress(status):
+            print(f"{status['processed']}/{status['total']} rows, {status['created']} created, "
+                  f"{status['failed']} failed")
+        summary = run_student_import(path, report, workers, progress)
+        invalidate_owner_cache('stats')
+        print(f"Created {summary['created']} students, {summary['failed']} rows failed (see {report})")
+
+    @app.cli.command('rebuild-student-summaries')
+    def rebuild_student_summaries():
+        # يشغل دورياً (كل ساعة) حتى تبقى نافذة المحاضرات القادمة في لوحة الطالب صحيحة
+        count = student_summary.rebuild()
+        print(f'Rebuilt dashboard counters for {count} students')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        # بعد إدراج مدرسين مباشرة في القاعدة (بدون ORM) أو بعد تعديل قواعد التطبيع
+        count = staff_search.rebuild()
+        print(f'Indexed {count} teachers and tutors')
+
+    @app.cli.command('rebuild-leaderboard')
+    def rebuild_leaderboard():
+        # يشغل دورياً (يومياً) لتحديث المتوسط العام الذي تحسب منه النقاط البايزية في Redis.
+        # بدون Redis يبني كل عامل لوحاته من القاعدة كل LEADERBOARD_LOCAL_TTL، ولا يفيد الأمر شيئاً
+        if cache.client is None:
+            print('REDIS_URL is not set: workers rebuild their local leaderboards on their own')
+            return
+        count = leaderboard.rebuild()
+        print(f'Ranked {count} teachers and tutors')
+
+    @app.cli.command('purge-reset-tokens')
+    @click.option('--batch-size', default=reset_tokens.PURGE_BATCH_SIZE)
+    def purge_reset_tokens(batch_size):
+        # يشغل دورياً لحذف رموز الاستعادة المنتهية
+        count = reset_tokens.purge_expired(batch_size)
+        print(f'Deleted {count} expired reset tokens')
+
+    @app.cli.command('send-mail')
+    def send_mail():
+        # إرسال الرسائل المستحقة في صندوق البريد الصادر (عند التشغيل بدون gunicorn)
+        count = mail_queue.drain()
+        print(f'Sent {count} emails, {mail_queue.pending()} still queued')
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+
+# مجمع اتصالات يقيس زمن انتظار الحصول على اتصال وعدد مرات نفاد المهلة
+class TimedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._local = threading.local()
+        event.listen(self, 'invalidate', self._on_invalidate)
+
+    def _do_get(self):
+        # QueuePool._do_get يستدعي نفسه أحياناً؛ نقيس الاستدعاء الخارجي فقط
+        if getattr(self._local, 'active', False):
+            return super()._do_get()
+        self._local.active = True
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            with self.stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            self._local.active = False
+            waited = time.perf_counter() - start
+            with self.stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self.stats_lock:
+            self.invalidations += 1
+
+
+def engine_options(db_url, environ=os.environ):
+    # قاعدة SQLite في الذاكرة تستخدم مجمعاً خاصاً بها فنتركها على الإعدادات الافتراضية
+    if db_url.startswith('sqlite') and ':memory:' in db_url:
+        return {}
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': int(environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(environ.get('DB_POOL_TIMEOUT', 10)),
+        # Render يغلق الاتصالات الخاملة، فنعيد تدوير الاتصال قبل ذلك ونفحصه قبل الاستخدام
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', 'True') == 'True',
+    }
+    if db_url.startswith('postgresql'):
+        statement_timeout = int(environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+        options['connect_args'] = {
+            'connect_timeout': int(environ.get('DB_CONNECT_TIMEOUT', 5)),
+            'options': f'-c statement_timeout={statement_timeout}',
+        }
+    return options
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    if isinstance(pool, TimedQueuePool):
+        with pool.stats_lock:
+            status.update({
+                'checkouts': pool.checkouts,
+                'timeouts': pool.timeouts,
+                'invalidations': pool.invalidations,
+                'wait_avg_ms': round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                'wait_max_ms': round(pool.wait_max * 1000, 3),
+            })
+    return status
@@ -0,0 +1,29 @@
+# نسخ الامتدادات المشتركة: تنشأ بدون تطبيق وتربط به في create_app،
+# فتستوردها المخططات (blueprints) وأوامر سطر الأوامر دون استيراد app نفسه
+from flask_login import LoginManager
+from flask_wtf.csrf import CSRFProtect
+from cache import Cache
+from fragment_cache import FragmentCache
+from image_pipeline import ImagePipeline
+from leaderboard import Leaderboard
+from mail_queue import MailQueue
+from metrics import Metrics
+from page_cache import PageCache
+from rate_limit import RateLimiter
+from static_assets import StaticManifest
+from student_import import StudentImport
+from user_cache import UserCache
+
+csrf = CSRFProtect()
+login_manager = LoginManager()
+mail_queue = MailQueue()
+image_pipeline = ImagePipeline()
+static_manifest = StaticManifest()
+fragment_cache = FragmentCache()
+metrics = Metrics()
+cache = Cache()
+student_import = StudentImport()
+user_cache = UserCache()
+leaderboard = Leaderboard()
+rate_limiter = RateLimiter()
+page_cache = PageCache()
@@ -1,4 +1,5 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileRequired
 from wtforms import StringField, PasswordField, SelectField, SubmitField, FloatField, FileField, IntegerField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, NumberRange, ValidationError, Optional
 
@@ -107,14 +108,49 @@ class ScheduleForm(FlaskForm):
         ('wednesday', 'الأربعاء'),
         ('thursday', 'الخميس')
     ], validators=[DataRequired()])
-    period1 = StringField('الحصة الأولى')
-    period2 = StringField('الحصة الثانية')
-    period3 = StringField('الحصة الثالثة')
-    period4 = StringField('الحصة الرابعة')
-    period5 = StringField('الحصة الخامسة')
-    period6 = StringField('الحصة السادسة')
+    period1 = SelectField('الحصة الأولى', coerce=int, choices=[])
+    teacher1 = SelectField('مدرس الحصة الأولى', coerce=int, choices=[])
+    period2 = SelectField('الحصة الثانية', coerce=int, choices=[])
+    teacher2 = SelectField('مدرس الحصة الثانية', coerce=int, choices=[])
+    period3 = SelectField('الحصة الثالثة', coerce=int, choices=[])
+    teacher3 = SelectField('مدرس الحصة الثالثة', coerce=int, choices=[])
+    period4 = SelectField('الحصة الرابعة', coerce=int, choices=[])
+    teacher4 = SelectField('مدرس الحصة الرابعة', coerce=int, choices=[])
+    period5 = SelectField('الحصة الخامسة', coerce=int, choices=[])
+    teacher5 = SelectField('مدرس الحصة الخامسة', coerce=int, choices=[])
+    period6 = SelectField('الحصة السادسة', coerce=int, choices=[])
+    teacher6 = SelectField('مدرس الحصة السادسة', coerce=int, choices=[])
     submit = SubmitField('حفظ الجدول')
 
+    def set_choices(self, subjects, teachers):
+        # subjects: [(id, class_level, label)]، teachers: [(id, الاسم)]
+        self.subject_levels = {subject_id: class_level for subject_id, class_level, _ in subjects}
+        subject_choices = [(0, '-')] + [(subject_id, label) for subject_id, _, label in subjects]
+        teacher_choices = [(0, 'بدون مدرس')] + list(teachers)
+        for period, teacher in self.period_fields():
+            period.choices = subject_choices
+            teacher.choices = teacher_choices
+
+    def period_fields(self):
+        return [(self[f'period{n}'], self[f'teacher{n}']) for n in range(1, 7)]
+
+    def periods(self):
+        return {n: (period.data, teacher.data) for n, (period, teacher) in enumerate(self.period_fields(), 1)}
+
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators):
+            return False
+
+        for period, teacher in self.period_fields():
+            if period.data and self.subject_levels.get(period.data) != self.class_level.data:
+                period.errors.append('المادة لا تتبع الصف المختار')
+                return False
+            if teacher.data and not period.data:
+                period.errors.append('يرجى اختيار مادة الحصة')
+                return False
+
+        return True
+
 class ForgotPasswordForm(FlaskForm):
     email = StringField('البريد الإلكتروني', validators=[DataRequired(), Email()])
     submit = SubmitField('إرسال رمز الاستعادة')
@@ -124,3 +160,32 @@ class ResetPasswordForm(FlaskForm):
     new_password = PasswordField('كلمة المرور الجديدة', validators=[DataRequired(), Length(min=6)])
     confirm_password = PasswordField('تأكيد كلمة المرور', validators=[DataRequired(), EqualTo('new_password')])
     submit = SubmitField('تحديث كلمة المرور')
+
+class StudentImportForm(FlaskForm):
+    file = FileField('ملف الطلاب (CSV)', validators=[FileRequired(), FileAllowed(['csv'], 'يرجى اختيار ملف CSV')])
+    submit = SubmitField('استيراد')
+
+class StaffSearchForm(FlaskForm):
+    # نموذج بحث بطريقة GET: بدون CSRF ويقرأ من request.args
+    class Meta:
+        csrf = False
+
+    q = StringField('بحث', validators=[Optional(), Length(max=100)])
+    user_type = SelectField('النوع', choices=[
+        ('', 'الكل'),
+        ('teacher', 'مدرسو المعهد'),
+        ('tutor', 'مدرسون خصوصيون')
+    ], validators=[Optional()])
+    subject_id = SelectField('المادة', coerce=int, default=0, choices=[], validators=[Optional()])
+    class_level = SelectField('الصف الدراسي', choices=[
+        ('', 'كل الصفوف'),
+        ('first_intermediate', 'الأول متوسط'),
+        ('second_intermediate', 'الثاني متوسط'),
+        ('third_intermediate', 'الثالث متوسط'),
+        ('fourth_science', 'الرابع علمي'),
+        ('fourth_literature', 'الرابع أدبي'),
+        ('fifth_science', 'الخامس علمي'),
+        ('fifth_literature', 'الخامس أدبي'),
+        ('sixth_science', 'السادس علمي'),
+        ('sixth_literature', 'السادس أدبي')
+    ], validators=[Optional()])
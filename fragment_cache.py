@@ -0,0 +1,90 @@
+import hashlib
+import os
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from cache import LRUCache
+
+
+# وسم {% cache 'اسم', مفتاح1, مفتاح2 %}...{% endcache %} لتخزين جزء من القالب بعد عرضه.
+# المفتاح يبنى من أرقام نسخ الصفوف المعروضة (fragment_stamp)، فأي تعديل ينتج مفتاحاً جديداً
+# ولا يحتاج الجزء المخزن إلى إلغاء صريح
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(parts)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        if self.environment.fragment_cache is None:
+            return caller()
+        return self.environment.fragment_cache.render(parts, caller)
+
+
+def fragment_stamp(rows, *fields):
+    # (المعرف، النسخة) لكل صف، مع حقول إضافية لا تغير نسخة المستخدم (مثل اسم المادة).
+    # get لأن القوائم المخزنة قبل إضافة النسخة تبقى حتى انتهاء صلاحيتها بعد النشر
+    return tuple((row['id'], row.get('version')) + tuple(row[field] for field in fields) for row in rows)
+
+
+# الأجزاء تخزن داخل العملية: المفاتيح مشتقة من النسخ فلا تحتاج إلى مشاركة الإلغاء بين العمال،
+# وقراءتها أسرع من رحلة إلى Redis. كما يضبط ذاكرة bytecode للقوالب على القرص
+# حتى لا يعيد كل عامل ترجمة القوالب بعد إعادة التشغيل
+class FragmentCache:
+    def __init__(self, app=None):
+        self.enabled = True
+        self.ttl = 3600
+        self.local = LRUCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FRAGMENT_CACHE_ENABLED', os.environ.get('FRAGMENT_CACHE_ENABLED', 'True') == 'True')
+        app.config.setdefault('FRAGMENT_CACHE_TTL', 3600)
+        app.config.setdefault('FRAGMENT_CACHE_SIZE', 512)
+        app.config.setdefault('TEMPLATE_BYTECODE_DIR', os.environ.get(
+            'TEMPLATE_BYTECODE_DIR', os.path.join(app.instance_path, 'jinja_cache')))
+        self.enabled = app.config['FRAGMENT_CACHE_ENABLED']
+        self.ttl = app.config['FRAGMENT_CACHE_TTL']
+        self.local = LRUCache(app.config['FRAGMENT_CACHE_SIZE'])
+
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        app.jinja_env.globals['fragment_stamp'] = fragment_stamp
+        if app.config['TEMPLATE_BYTECODE_DIR']:
+            os.makedirs(app.config['TEMPLATE_BYTECODE_DIR'], exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['TEMPLATE_BYTECODE_DIR'])
+        app.extensions['fragment_cache'] = self
+
+        @app.cli.command('compile-templates')
+        def compile_templates():
+            # يشغل أثناء البناء: ترجمة كل القوالب مسبقاً إلى ذاكرة bytecode
+            names = app.jinja_env.list_templates(extensions=['html'])
+            for name in names:
+                app.jinja_env.get_template(name)
+            print(f'Compiled {len(names)} templates')
+
+    @staticmethod
+    def key(parts):
+        return 'fragment:' + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def render(self, parts, caller):
+        if not self.enabled:
+            return caller()
+        key = self.key(parts)
+        html = self.local.get(key)
+        if html is None:
+            html = caller()
+            self.local.set(key, html, self.ttl)
+        return html
+
+    def clear(self):
+        self.local.clear()
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import tempfile
+
+# إعدادات gunicorn للإنتاج (يقرأها gunicorn تلقائياً من مجلد المشروع)
+#
+#   GUNICORN_WORKER_CLASS = gthread (الافتراضي) | gevent | sync
+#   WEB_CONCURRENCY       = عدد العمال (وإلا يحسب من المعالجات والذاكرة)
+#   GUNICORN_THREADS      = خيوط كل عامل في وضع gthread
+#   WORKER_MEMORY_MB      = تقدير ذاكرة العامل الواحد لحساب الحد الأقصى للعمال
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def _memory_limit_mb():
+    # حد الذاكرة من cgroup (الحاويات على Render) ثم ذاكرة الجهاز
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value.isdigit() and int(value) < 1 << 60:
+                return int(value) // (1024 * 1024)
+        except OSError:
+            continue
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (ValueError, OSError):
+        return None
+
+
+def _default_workers():
+    workers = _cpu_count() * 2 + 1
+    memory = _memory_limit_mb()
+    if memory:
+        per_worker = int(os.environ.get('WORKER_MEMORY_MB', 150))
+        workers = min(workers, max(memory // per_worker, 1))
+    return max(workers, 1)
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', _default_workers()))
+
+if worker_class == 'gthread':
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+elif worker_class == 'gevent':
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+
+# تحميل التطبيق مرة واحدة في العملية الرئيسية قبل التفرع لتقليل زمن الإقلاع والذاكرة
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+# إعادة تشغيل العامل بعد عدد من الطلبات (مع تفاوت عشوائي) للحد من تراكم الذاكرة
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
+
+# مجلد مشترك بين العمال لتجميع قياسات /metrics (يضبط قبل تحميل التطبيق حتى يرثه كل عامل)
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'academy-metrics'))
+
+
+def on_starting(server):
+    from metrics import reset_dir
+    reset_dir(os.environ['METRICS_DIR'])
+
+
+def post_fork(server, worker):
+    # اتصالات قاعدة البيانات لا تشارك بين العمليات: كل عامل يبدأ بمجمع اتصالات جديد
+    from wsgi import app
+    from models import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning('psycogreen not installed: psycopg2 calls will block the gevent loop')
+
+    # عمال البريد يرسلون ما بقي في صندوق البريد الصادر من عامل سابق دون انتظار رسالة جديدة
+    from extensions import mail_queue
+    mail_queue.start()
+
+
+def worker_exit(server, worker):
+    # آخر لقطة لقياسات العامل قبل خروجه (بما فيها الطلبات منذ آخر حفظ)
+    from wsgi import app
+    from extensions import metrics
+    with app.app_context():
+        metrics.flush()
+
+
+def child_exit(server, worker):
+    # عدادات العامل المنتهي تنقل إلى الأرشيف فتبقى مجاميع /metrics تراكمية
+    from metrics import retire_worker
+    retire_worker(os.environ['METRICS_DIR'], worker.pid)
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import url_for
+
+# مقاسات الصور المصغرة (بالبكسل) التي تولد لكل صورة ملف شخصي
+IMAGE_SIZES = (64, 160, 320)
+IMAGE_FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+
+
+# معالجة صور الملف الشخصي في الخلفية: الطلب يحفظ الملف ويحسب بصمته فقط،
+# والعامل يولد نسخاً مصغرة بدون بيانات وصفية بأسماء مشتقة من محتوى الصورة.
+# مفتاح الصورة يعطى للمستخدم (on_complete) بعد وجود كل النسخ فقط، فإذا فشلت المعالجة
+# أو توقف العامل قبلها يبقى المستخدم بالصورة الافتراضية بدل روابط srcset لا توجد ملفاتها
+class ImagePipeline:
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self.upload_folder = None
+        self.incoming_folder = None
+        self.workers = 2
+        self.incoming_max_age = 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_WORKERS', int(os.environ.get('IMAGE_WORKERS', 2)))
+        app.config.setdefault('IMAGE_INCOMING_FOLDER', os.path.join(tempfile.gettempdir(), 'academy-incoming'))
+        # الملفات المؤقتة الأقدم من هذا تركها عامل توقف قبل معالجتها، فتحذف
+        app.config.setdefault('IMAGE_INCOMING_MAX_AGE', 3600)
+        self.app = app
+        self.upload_folder = app.config['UPLOAD_FOLDER']
+        self.incoming_folder = app.config['IMAGE_INCOMING_FOLDER']
+        self.workers = app.config['IMAGE_WORKERS']
+        self.incoming_max_age = app.config['IMAGE_INCOMING_MAX_AGE']
+        os.makedirs(self.incoming_folder, exist_ok=True)
+        app.extensions['image_pipeline'] = self
+
+    def _pool(self):
+        # المجمع ينشأ داخل كل عملية عند أول استخدام (الخيوط لا تنتقل مع fork)
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._purge_incoming()
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='image-worker')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _purge_incoming(self):
+        cutoff = time.time() - self.incoming_max_age
+        for entry in os.scandir(self.incoming_folder):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def save_upload(self, file):
+        # يعيد (المسار المؤقت، مفتاح الصورة) لتمريره إلى process، أو None إذا لم يكن الملف صورة.
+        # نسخ الملف على دفعات إلى مجلد مؤقت خارج static مع حساب البصمة أثناء النسخ
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.incoming_folder)
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file.stream.read(64 * 1024)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+
+        # فتح الصورة يقرأ الترويسة فقط، ويكفي لرفض الملفات التي ليست صوراً قبل الرد.
+        # Pillow تحمل عند أول رفع صورة فقط، لا عند إقلاع كل عامل
+        from PIL import Image
+        try:
+            with Image.open(tmp_path):
+                pass
+        except Exception:
+            os.remove(tmp_path)
+            return None
+
+        return tmp_path, digest.hexdigest()[:20]
+
+    def process(self, upload, on_complete):
+        # on_complete(image_key) يستدعى داخل سياق التطبيق بعد كتابة كل النسخ المصغرة
+        tmp_path, image_key = upload
+        self._pool().submit(self._process, tmp_path, image_key, on_complete)
+
+    def _process(self, tmp_path, image_key, on_complete):
+        from PIL import Image, ImageOps
+        try:
+            if not all(os.path.exists(path) for path in self.variant_paths(image_key)):
+                with Image.open(tmp_path) as img:
+                    img = ImageOps.exif_transpose(img).convert('RGB')
+                    for size in IMAGE_SIZES:
+                        thumb = ImageOps.fit(img, (size, size), Image.LANCZOS)
+                        for ext, fmt in IMAGE_FORMATS:
+                            self._write(thumb, os.path.join(self.upload_folder, f'{image_key}-{size}.{ext}'), fmt)
+        except Exception:
+            self.app.logger.exception('Could not process image %s', image_key)
+            return
+        finally:
+            os.remove(tmp_path)
+
+        with self.app.app_context():
+            try:
+                on_complete(image_key)
+            except Exception:
+                self.app.logger.exception('Could not attach image %s', image_key)
+
+    @staticmethod
+    def _write(image, path, fmt):
+        # الحفظ باسم مؤقت ثم النقل حتى لا يقدم ملف نصف مكتوب
+        # (الصورة أعيد ترميزها من البكسلات فقط، فلا تنتقل بيانات EXIF أو GPS)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as out:
+            image.save(out, fmt, quality=82, optimize=True)
+        shutil.move(tmp_path, path)
+        os.chmod(path, 0o644)
+
+    def variant_paths(self, image_key):
+        return [os.path.join(self.upload_folder, f'{image_key}-{size}.{ext}')
+                for size in IMAGE_SIZES for ext, _ in IMAGE_FORMATS]
+
+
+def upload_url(filename):
+    return url_for('static', filename='uploads/' + filename)
+
+def image_variants(image):
+    # الصور القديمة محفوظة باسم الملف الأصلي (فيه امتداد) وليس لها نسخ مصغرة
+    if not image or '.' in image:
+        return None
+    return {
+        'src': upload_url(f'{image}-160.jpg'),
+        'webp': ', '.join(upload_url(f'{image}-{size}.webp') + f' {size}w' for size in IMAGE_SIZES),
+        'jpg': ', '.join(upload_url(f'{image}-{size}.jpg') + f' {size}w' for size in IMAGE_SIZES),
+    }
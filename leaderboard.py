@@ -0,0 +1,302 @@
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from models import db, User, Subject, Rating
+
+STAFF_TYPES = ('teacher', 'tutor')
+# منتصف سلم التقييم (1-5)، يبدأ منه المتوسط العام عندما تكون التقييمات قليلة
+NEUTRAL_RATING = 3.0
+
+
+def bayesian_score(rating_sum, rating_count, mean, weight):
+    # متوسط بايزي: كل مدرس يبدأ بـ weight تقييمات وهمية بقيمة المتوسط العام،
+    # فتقييم واحد بخمس نجوم لا يتقدم على 200 تقييم بمتوسط 4.8
+    return (weight * mean + rating_sum) / (weight + rating_count)
+
+
+def boards_for(user_type, subject_id, class_level):
+    # لوحة لكل نوع، ولمدرسي المعهد لوحة لمادتهم ولصفها أيضاً
+    boards = [f'type:{user_type}']
+    if subject_id:
+        boards.append(f'subject:{subject_id}')
+    if class_level:
+        boards.append(f'class:{class_level}')
+    return boards
+
+
+def _stats(connection, teacher_ids=None):
+    # (id, النوع، المادة، الصف، مجموع التقييمات، عددها) للمدرسين
+    statement = select(User.id, User.user_type, User.subject_id, Subject.class_level,
+                       func.coalesce(User.rating_sum, 0), func.coalesce(User.rating_count, 0)) \
+        .outerjoin(Subject, Subject.id == User.subject_id)
+    if teacher_ids is None:
+        statement = statement.where(User.user_type.in_(STAFF_TYPES), User.rating_count > 0)
+    else:
+        statement = statement.where(User.id.in_(teacher_ids))
+    return connection.execute(statement).all()
+
+
+def _mean(rows, weight):
+    # المتوسط العام لكل التقييمات من مجاميع المدرسين نفسها، ويثبت بين عمليات البناء الكامل،
+    # فيقرب من منتصف السلم حتى لا يحدده أول تقييم في قاعدة شبه فارغة
+    total = sum(row[4] for row in rows)
+    count = sum(row[5] for row in rows)
+    return bayesian_score(total, count, NEUTRAL_RATING, weight)
+
+
+def _entries(rows, mean, weight):
+    # {id: (اللوحات، النقاط)}، والمدرس بلا تقييمات أو الذي لم يعد مدرساً لا يظهر في أي لوحة
+    entries = {}
+    for teacher_id, user_type, subject_id, class_level, rating_sum, rating_count in rows:
+        if user_type in STAFF_TYPES and rating_count:
+            entries[teacher_id] = (boards_for(user_type, subject_id, class_level),
+                                   bayesian_score(rating_sum, rating_count, mean, weight))
+    return entries
+
+
+# مجموعة مرتبة داخل العملية بنفس واجهة ZADD/ZREVRANGE/ZREVRANK:
+# قائمة مرتبة بـ (-النقاط، المعرف) يبحث فيها بـ bisect
+class LocalBoard:
+    def __init__(self):
+        self.scores = {}
+        self.order = []
+
+    def add(self, member, score):
+        self.remove(member)
+        self.scores[member] = score
+        insort(self.order, (-score, member))
+
+    def remove(self, member):
+        score = self.scores.pop(member, None)
+        if score is not None:
+            del self.order[bisect_left(self.order, (-score, member))]
+
+    def top(self, start, stop):
+        return [(member, -score) for score, member in self.order[start:stop]]
+
+    def rank(self, member):
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        return bisect_left(self.order, (-score, member))
+
+
+# ترتيب المدرسين حسب التقييم في مجموعات Redis المرتبة (ZSET)، مع نسخة داخل العملية
+# عند تعذر Redis. النقاط تحدث لكل مدرس بعد حفظ تقييم جديد، والقراءة O(log n)
+class Leaderboard:
+    def __init__(self, app=None, cache=None):
+        self.cache = None
+        self.weight = 10
+        self.local_ttl = 600
+        self._local = None
+        self._local_expires = 0
+        self._lock = threading.Lock()
+        # تحديثات طبقت على النسخة المحلية فقط أثناء انقطاع Redis، فيعاد بناؤه عند عودته
+        self._redis_stale = False
+        if app is not None:
+            self.init_app(app, cache)
+
+    def init_app(self, app, cache):
+        app.config.setdefault('LEADERBOARD_PRIOR_WEIGHT', float(os.environ.get('LEADERBOARD_PRIOR_WEIGHT', 10)))
+        app.config.setdefault('LEADERBOARD_LOCAL_TTL', 600)
+        self.cache = cache
+        self.weight = app.config['LEADERBOARD_PRIOR_WEIGHT']
+        self.local_ttl = app.config['LEADERBOARD_LOCAL_TTL']
+        app.extensions['leaderboard'] = self
+
+        if not event.contains(Rating, 'after_insert', self._mark_changed):
+            event.listen(Rating, 'after_insert', self._mark_changed)
+            event.listen(Rating, 'after_delete', self._mark_changed)
+            event.listen(User, 'after_update', self._mark_staff_changed)
+            event.listen(User, 'after_delete', self._mark_staff_removed)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def _key(self, name):
+        return f'{self.cache.prefix}leaderboard:{name}'
+
+    # القراءة
+
+    def top(self, board, limit=20, offset=0):
+        # board اسم لوحة، أو مجموعة لوحات لا يتكرر فيها مدرس (مثل مدرسي صف مع المدرسين الخصوصيين)
+        # فتدمج قوائمها المرتبة حسب النقاط
+        if not isinstance(board, str):
+            merged = heapq.merge(*[self.top(name, offset + limit) for name in board], key=lambda entry: -entry[1])
+            return list(islice(merged, offset, offset + limit))
+        client = self._redis()
+        if client is not None:
+            try:
+                return [(int(member), score) for member, score in
+                        client.zrevrange(self._key(board), offset, offset + limit - 1, withscores=True)]
+            except self.cache.errors as e:
+                self.cache.redis_failed(e)
+        return self._local_boards()[0].get(board, LocalBoard()).top(offset, offset + limit)
+
+    def rank(self, teacher_id, board):
+        # الترتيب يبدأ من 1، أو None إذا لم يكن المدرس في اللوحة
+        client = self._redis()
+        if client is not None:
+            try:
+                rank = client.zrevrank(self._key(board), teacher_id)
+                return rank + 1 if rank is not None else None
+            except self.cache.errors as e:
+                self.cache.redis_failed(e)
+        rank = self._local_boards()[0].get(board, LocalBoard()).rank(teacher_id)
+        return rank + 1 if rank is not None else None
+
+    # البناء الكامل
+
+    def rebuild(self):
+        # يعيد حساب المتوسط العام وكل النقاط (بعد seed أو rebuild-ratings، ودورياً لتحديث المتوسط)
+        with db.engine.connect() as connection:
+            rows = _stats(connection)
+        mean = _mean(rows, self.weight)
+        entries = _entries(rows, mean, self.weight)
+        with self._lock:
+            self._local = None
+        client = self.cache.redis()
+        if client is not None:
+            try:
+                self._write_all(client, mean, entries)
+                self._redis_stale = False
+            except self.cache.errors as e:
+                self.cache.redis_failed(e)
+        return len(entries)
+
+    def _write_all(self, client, mean, entries):
+        # كل اللوحات تستبدل في معاملة MULTI واحدة، فلا يرى القارئ لوحة نصف مبنية
+        old = list(client.scan_iter(match=self._key('*')))
+        pipe = client.pipeline(transaction=True)
+        if old:
+            pipe.delete(*old)
+        boards = {}
+        for teacher_id, (names, score) in entries.items():
+            for name in names:
+                boards.setdefault(name, {})[teacher_id] = score
+        for name, members in boards.items():
+            pipe.zadd(self._key(name), members)
+        if entries:
+            pipe.hset(self._key('members'), mapping={teacher_id: ','.join(names)
+                                                     for teacher_id, (names, _) in entries.items()})
+        pipe.hset(self._key('meta'), mapping={'mean': mean, 'built_at': time.time()})
+        pipe.execute()
+
+    def _redis(self):
+        client = self.cache.redis()
+        if client is None:
+            return None
+        try:
+            if self._redis_stale or not client.exists(self._key('meta')):
+                self.rebuild()
+        except self.cache.errors as e:
+            self.cache.redis_failed(e)
+            return None
+        return self.cache.redis()
+
+    def _local_boards(self):
+        # النسخة المحلية تبنى من القاعدة عند الحاجة وتحدث دورياً لتلحق بتحديثات العمال الآخرين
+        with self._lock:
+            if self._local is None or self._local_expires < time.monotonic():
+                with db.engine.connect() as connection:
+                    rows = _stats(connection)
+                mean = _mean(rows, self.weight)
+                entries = _entries(rows, mean, self.weight)
+                boards, members = {}, {}
+                for teacher_id, (names, score) in entries.items():
+                    members[teacher_id] = names
+                    for name in names:
+                        boards.setdefault(name, LocalBoard()).add(teacher_id, score)
+                self._local = (boards, members, mean)
+                self._local_expires = time.monotonic() + self.local_ttl
+            return self._local
+
+    # التحديث التدريجي
+
+    def update(self, *teacher_ids):
+        if not teacher_ids:
+            return
+        client = self._redis()
+        if client is not None:
+            try:
+                self._update_redis(client, teacher_ids)
+                return
+            except self.cache.errors as e:
+                self.cache.redis_failed(e)
+                self._redis_stale = True
+        elif self.cache.client is not None:
+            self._redis_stale = True
+        self._update_local(teacher_ids)
+
+    def _update_redis(self, client, teacher_ids):
+        pipe = client.pipeline(transaction=False)
+        pipe.hget(self._key('meta'), 'mean')
+        pipe.hmget(self._key('members'), teacher_ids)
+        mean, old = pipe.execute()
+        with db.engine.connect() as connection:
+            entries = _entries(_stats(connection, teacher_ids), float(mean), self.weight)
+
+        pipe = client.pipeline(transaction=True)
+        for teacher_id, old_names in zip(teacher_ids, old):
+            names, score = entries.get(teacher_id, ([], None))
+            for name in set(old_names.decode().split(',') if old_names else []) - set(names):
+                pipe.zrem(self._key(name), teacher_id)
+            for name in names:
+                pipe.zadd(self._key(name), {teacher_id: score})
+            if names:
+                pipe.hset(self._key('members'), teacher_id, ','.join(names))
+            else:
+                pipe.hdel(self._key('members'), teacher_id)
+        pipe.execute()
+
+    def _update_local(self, teacher_ids):
+        # إذا لم تبن النسخة المحلية بعد (أو انتهت) فستبنى كاملة عند أول قراءة
+        if self._local is None or self._local_expires < time.monotonic():
+            return
+        boards, members, mean = self._local_boards()
+        with db.engine.connect() as connection:
+            entries = _entries(_stats(connection, teacher_ids), mean, self.weight)
+        with self._lock:
+            for teacher_id in teacher_ids:
+                for name in members.pop(teacher_id, []):
+                    boards[name].remove(teacher_id)
+                if teacher_id in entries:
+                    names, score = entries[teacher_id]
+                    members[teacher_id] = names
+                    for name in names:
+                        boards.setdefault(name, LocalBoard()).add(teacher_id, score)
+
+    # المدرسون الذين تغيرت تقييماتهم أو بياناتهم يجمعون في الجلسة ويحدثون بعد نجاح الحفظ فقط
+
+    def changed(self, *teacher_ids):
+        db.session.info.setdefault('leaderboard_changed', set()).update(teacher_ids)
+
+    @staticmethod
+    def _mark(target, teacher_id):
+        inspect(target).session.info.setdefault('leaderboard_changed', set()).add(teacher_id)
+
+    def _mark_changed(self, mapper, connection, target):
+        self._mark(target, target.teacher_id)
+
+    def _mark_staff_changed(self, mapper, connection, target):
+        # تغيير المادة أو النوع ينقل المدرس بين اللوحات
+        state = inspect(target)
+        if state.attrs.subject_id.history.has_changes() or state.attrs.user_type.history.has_changes():
+            self._mark(target, target.id)
+
+    def _mark_staff_removed(self, mapper, connection, target):
+        if target.user_type in STAFF_TYPES:
+            self._mark(target, target.id)
+
+    def _after_commit(self, session):
+        changed = session.info.pop('leaderboard_changed', None)
+        if changed:
+            self.update(*changed)
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop('leaderboard_changed', None)
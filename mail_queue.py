@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session
+from models import db, MailOutbox
+
+
+# صندوق بريد صادر: المسار يضيف الرسالة إلى جدول mail_outbox في معاملته ويعود فوراً،
+# ومجموعة عمال في الخلفية تحجز الرسائل المستحقة وترسلها عبر اتصالات SMTP معاد استخدامها.
+# الرسالة تحذف بعد إرسالها فقط، فإعادة تشغيل العامل (نشر أو max_requests) لا تضيع البريد
+# ولا المحاولات المؤجلة: يرسلها أي عامل آخر عند موعدها
+class MailQueue:
+    def __init__(self, app=None):
+        self.app = None
+        self._workers = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self.config = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MAIL_WORKERS', int(os.environ.get('MAIL_WORKERS', 2)))
+        app.config.setdefault('MAIL_MAX_RETRIES', int(os.environ.get('MAIL_MAX_RETRIES', 3)))
+        app.config.setdefault('MAIL_RETRY_BACKOFF', float(os.environ.get('MAIL_RETRY_BACKOFF', 2)))
+        app.config.setdefault('MAIL_TIMEOUT', float(os.environ.get('MAIL_TIMEOUT', 10)))
+        # إغلاق الاتصال الخامل بعد هذه المدة بدل إبقائه مفتوحاً مع الخادم
+        app.config.setdefault('MAIL_IDLE_TIMEOUT', float(os.environ.get('MAIL_IDLE_TIMEOUT', 30)))
+        # فحص الصندوق دورياً لالتقاط الرسائل التي تركها عامل متوقف أو أجلت لإعادة المحاولة
+        app.config.setdefault('MAIL_POLL_INTERVAL', float(os.environ.get('MAIL_POLL_INTERVAL', 5)))
+        # مدة حجز الرسالة: إذا توقف العامل أثناء الإرسال تعود مستحقة بعدها
+        app.config.setdefault('MAIL_CLAIM_TIMEOUT', float(os.environ.get('MAIL_CLAIM_TIMEOUT', 60)))
+        self.app = app
+        self.config = app.config
+        app.extensions['mail_queue'] = self
+
+        if not event.contains(Session, 'after_commit', self._after_commit):
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def send(self, to, subject, body):
+        # الرسالة تضاف إلى جلسة المستدعي ولا تحفظ هنا: تحفظ مع بقية تغييرات الطلب عند
+        # db.session.commit()، فلا يحفظ الإرسال شيئاً لم يقصده المستدعي، ولا يرسل بريد لمعاملة تراجعت
+        db.session.add(MailOutbox(recipient=to, subject=subject, body=body, attempts=0,
+                                  next_attempt_at=datetime.now(timezone.utc)))
+        db.session.info['mail_queued'] = True
+
+    # بعد حفظ رسالة جديدة يوقظ العمال بدل انتظار الفحص الدوري
+    def _after_commit(self, session):
+        if session.info.pop('mail_queued', None):
+            self.start()
+            self._wake.set()
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop('mail_queued', None)
+
+    def pending(self):
+        with self.app.app_context():
+            return db.session.scalar(select(func.count(MailOutbox.id)))
+
+    def join(self, timeout=None):
+        # انتظار إفراغ الصندوق، بما فيه الرسائل المؤجلة لإعادة المحاولة (للاختبارات وعند الإيقاف).
+        # يعيد False إذا انتهت المهلة وبقيت رسائل
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def start(self):
+        # العمال يبدأون داخل كل عملية (post_fork في gunicorn أو أول رسالة)، لأن الخيوط لا تنتقل مع fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._workers = []
+            for i in range(self.config.get('MAIL_WORKERS', 2)):
+                worker = threading.Thread(target=self._run, name=f'mail-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            self._pid = os.getpid()
+
+    def drain(self):
+        # إرسال كل الرسائل المستحقة في العملية الحالية ثم العودة (أمر send-mail)
+        server, sent = self._deliver_due(None)
+        if server is not None:
+            self._close(server)
+        return sent
+
+    def _connect(self):
+        import smtplib
+        server = smtplib.SMTP(self.config['MAIL_SERVER'], self.config['MAIL_PORT'],
+                              timeout=self.config.get('MAIL_TIMEOUT', 10))
+        if self.config.get('MAIL_USE_TLS'):
+            server.starttls()
+        if self.config.get('MAIL_USERNAME'):
+            server.login(self.config['MAIL_USERNAME'], self.config['MAIL_PASSWORD'])
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _message(self, row):
+        # مكتبات البريد تحمل عند أول رسالة فقط، لا عند إقلاع كل عامل
+        from email.mime.text import MIMEText
+        msg = MIMEText(row['body'])
+        msg['Subject'] = row['subject']
+        msg['From'] = self.config.get('MAIL_DEFAULT_SENDER')
+        msg['To'] = row['recipient']
+        return msg
+
+    def _claim(self):
+        # الحجز بعبارة UPDATE مشروطة بعدد المحاولات المقروء: إذا سبق عامل آخر لا يتغير أي صف.
+        # الحجز يزيد المحاولات ويؤجل الموعد، فالرسالة التي توقف عاملها تعاد بعد MAIL_CLAIM_TIMEOUT
+        now = datetime.now(timezone.utc)
+        candidates = db.session.execute(
+            select(MailOutbox.id, MailOutbox.recipient, MailOutbox.subject, MailOutbox.body, MailOutbox.attempts)
+            .where(MailOutbox.next_attempt_at <= now)
+            .order_by(MailOutbox.next_attempt_at).limit(len(self._workers) or 1)
+        ).all()
+        for row in candidates:
+            result = db.session.execute(
+                update(MailOutbox)
+                .where(MailOutbox.id == row.id, MailOutbox.attempts == row.attempts)
+                .values(attempts=row.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=self.config.get('MAIL_CLAIM_TIMEOUT', 60)))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                return dict(row._mapping, attempts=row.attempts + 1)
+        return None
+
+    def _sent(self, message_id):
+        db.session.execute(delete(MailOutbox).where(MailOutbox.id == message_id)
+                           .execution_options(synchronize_session=False))
+        db.session.commit()
+
+    def _failed(self, row, error):
+        if row['attempts'] > self.config.get('MAIL_MAX_RETRIES', 3):
+            self.app.logger.error('Giving up on email to %s after %d attempts: %s',
+                                  row['recipient'], row['attempts'], error)
+            self._sent(row['id'])
+            return
+        # تراجع أسي: 2، 4، 8 ثوانٍ ... والرسالة تبقى في الجدول حتى موعدها
+        delay = self.config.get('MAIL_RETRY_BACKOFF', 2) ** row['attempts']
+        self.app.logger.warning('Email to %s failed (attempt %d), retrying in %.0f s: %s',
+                                row['recipient'], row['attempts'], delay, error)
+        db.session.execute(
+            update(MailOutbox).where(MailOutbox.id == row['id'])
+            .values(next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def _deliver_due(self, server):
+        # يرسل الرسائل المستحقة واحدة بعد أخرى على الاتصال نفسه حتى لا يبقى منها شيء
+        sent = 0
+        while True:
+            with self.app.app_context():
+                row = self._claim()
+            if row is None:
+                return server, sent
+            try:
+                if server is None:
+                    server = self._connect()
+                server.send_message(self._message(row))
+            except Exception as e:
+                if server is not None:
+                    self._close(server)
+                    server = None
+                with self.app.app_context():
+                    self._failed(row, e)
+            else:
+                with self.app.app_context():
+                    self._sent(row['id'])
+                sent += 1
+
+    def _run(self):
+        # كل عامل يحتفظ باتصال واحد ويعيد استخدامه، ويغلقه بعد MAIL_IDLE_TIMEOUT بلا رسائل
+        server = None
+        last_sent = time.monotonic()
+        while True:
+            try:
+                server, sent = self._deliver_due(server)
+                if sent:
+                    last_sent = time.monotonic()
+            except Exception:
+                # تعذر الوصول إلى قاعدة البيانات: المحاولة في الدورة التالية
+                self.app.logger.exception('Mail worker could not read the outbox')
+            if server is not None and time.monotonic() - last_sent >= self.config.get('MAIL_IDLE_TIMEOUT', 30):
+                self._close(server)
+                server = None
+            self._wake.wait(self.config.get('MAIL_POLL_INTERVAL', 5))
+            self._wake.clear()
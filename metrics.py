@@ -0,0 +1,296 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+HISTOGRAMS = ('latency', 'sql_statements', 'sql_time', 'templates')
+# قياسات العمال المنتهين تجمع في هذا الملف داخل METRICS_DIR حتى تبقى العدادات تراكمية
+ARCHIVE = 'archive.json'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # العدادات تراكمية كما يتوقعها Prometheus (كل حد يشمل ما دونه)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def redact(statement):
+    # المعاملات المربوطة لا تسجل أصلاً، والنصوص الحرفية داخل الاستعلام تستبدل بعلامة ?
+    return STRING_LITERAL.sub("'?'", ' '.join(statement.split()))
+
+
+def _worker_path(directory, pid):
+    return os.path.join(directory, f'worker-{pid}.json')
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _merge(total, snapshot):
+    # جمع لقطة عامل إلى المجموع: العدادات وخانات المدرجات تجمع كما هي
+    for key, count in snapshot['requests']:
+        key = tuple(key)
+        total['requests'][key] = total['requests'].get(key, 0) + count
+    for name in HISTOGRAMS:
+        store = total[name]
+        for key, buckets, counts, hist_total, hist_count in snapshot[name]:
+            key = tuple(key) if isinstance(key, list) else key
+            hist = store.get(key)
+            if hist is None:
+                hist = store[key] = Histogram(tuple(buckets))
+            hist.counts = [a + b for a, b in zip(hist.counts, counts)]
+            hist.total += hist_total
+            hist.count += hist_count
+    total['slow_queries'] += snapshot['slow_queries']
+    # المقاييس اللحظية تجمع بين العمال، عدا المتوسطات والقيم القصوى فيؤخذ أعلاها
+    for name, value in snapshot.get('gauges', {}).items():
+        if name in total['gauges'] and name.endswith(('_avg_ms', '_max_ms')):
+            value = max(value, total['gauges'][name])
+        elif name in total['gauges']:
+            value += total['gauges'][name]
+        total['gauges'][name] = value
+    return total
+
+
+def _empty():
+    return dict({name: {} for name in HISTOGRAMS}, requests={}, slow_queries=0, gauges={})
+
+
+def reset_dir(directory):
+    # يستدعى عند إقلاع gunicorn: ملفات تشغيل سابق لا تجمع مع العمال الجدد
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            os.remove(os.path.join(directory, name))
+
+
+def retire_worker(directory, pid):
+    # يستدعى من العملية الرئيسية في gunicorn بعد خروج العامل: عداداته تضاف إلى الأرشيف
+    # (بدون المقاييس اللحظية) حتى لا تنخفض المجاميع بعد إعادة تشغيل العمال
+    path = _worker_path(directory, pid)
+    snapshot = _read(path)
+    if snapshot is None:
+        return
+    snapshot['gauges'] = {}
+    archive_path = os.path.join(directory, ARCHIVE)
+    archive = _read(archive_path)
+    total = _merge(_merge(_empty(), archive), snapshot) if archive else _merge(_empty(), snapshot)
+    _write(archive_path, _dump(total))
+    os.remove(path)
+
+
+def _dump(state):
+    def histograms(store):
+        return [[list(key) if isinstance(key, tuple) else key, list(hist.buckets), hist.counts, hist.total,
+                 hist.count] for key, hist in store.items()]
+    return dict({name: histograms(state[name]) for name in HISTOGRAMS},
+                requests=[[list(key), count] for key, count in state['requests'].items()],
+                slow_queries=state['slow_queries'], gauges=state['gauges'])
+
+
+# قياسات الأداء لكل طلب: زمن المسار، عدد استعلامات SQL وزمنها، زمن عرض القوالب،
+# وسجل للاستعلامات البطيئة. تعرض بصيغة Prometheus عبر render().
+# كل عامل gunicorn يحفظ قياساته دورياً في METRICS_DIR، والعامل الذي يجيب /metrics يجمعها
+# مع أرشيف العمال المنتهين، فتكون السلاسل واحدة للخدمة كلها مهما أعيد تشغيل العمال
+class Metrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.sql_statements = {}
+        self.sql_time = {}
+        self.templates = {}
+        self.slow_queries = 0
+        self.gauges = {}
+        self.slow_query_seconds = 0.25
+        self.logger = None
+        self.directory = None
+        self.flush_seconds = 5
+        self._flushed_at = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_MS', int(os.environ.get('SLOW_QUERY_MS', 250)))
+        # بدون METRICS_DIR (خادم التطوير) تعرض قياسات العملية الحالية فقط
+        app.config.setdefault('METRICS_DIR', os.environ.get('METRICS_DIR'))
+        app.config.setdefault('METRICS_FLUSH_SECONDS', float(os.environ.get('METRICS_FLUSH_SECONDS', 5)))
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        self.logger = app.logger
+        self.directory = app.config['METRICS_DIR']
+        self.flush_seconds = app.config['METRICS_FLUSH_SECONDS']
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        app.extensions['metrics'] = self
+
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def add_gauges(self, prefix, source):
+        # مصدر قيم لحظية (مثل حالة مجمع الاتصالات) يستدعى عند كل قراءة لـ /metrics
+        self.gauges[prefix] = source
+
+    def _start_request(self):
+        g.request_start = time.perf_counter()
+        g.sql_time = 0.0
+
+    def _finish_request(self, response):
+        start = g.pop('request_start', None)
+        if start is None or request.endpoint == 'main.metrics':
+            return response
+        elapsed = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            key = (endpoint, request.method, response.status_code)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self._histogram(self.latency, (endpoint, request.method), LATENCY_BUCKETS).observe(elapsed)
+            self._histogram(self.sql_statements, endpoint, STATEMENT_BUCKETS).observe(
+                g.get('sql_statements', 0))
+            self._histogram(self.sql_time, endpoint, LATENCY_BUCKETS).observe(g.get('sql_time', 0.0))
+        if self.directory and time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if has_request_context():
+            g.sql_time = g.get('sql_time', 0.0) + elapsed
+        if elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self.slow_queries += 1
+            if self.logger is not None:
+                where = request.endpoint if has_request_context() else 'no request'
+                self.logger.warning('Slow query (%.0f ms, %s): %s', elapsed * 1000, where, redact(statement))
+
+    def _before_render(self, sender, template, context, **extra):
+        g.setdefault('template_starts', []).append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        starts = g.get('template_starts')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        with self._lock:
+            self._histogram(self.templates, template.name or 'string', LATENCY_BUCKETS).observe(elapsed)
+
+    @staticmethod
+    def _histogram(store, key, buckets):
+        histogram = store.get(key)
+        if histogram is None:
+            histogram = store[key] = Histogram(buckets)
+        return histogram
+
+    def _snapshot(self):
+        gauges = {}
+        for prefix, source in self.gauges.items():
+            for name, value in source().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f'{prefix}_{name}'] = value
+        with self._lock:
+            return _dump(dict({name: getattr(self, name) for name in HISTOGRAMS}, requests=self.requests,
+                              slow_queries=self.slow_queries, gauges=gauges))
+
+    def flush(self):
+        # لقطة قياسات هذا العامل لبقية العمال (بعد الطلبات كل METRICS_FLUSH_SECONDS، وعند خروج العامل)
+        if self.directory:
+            self._flushed_at = time.monotonic()
+            _write(_worker_path(self.directory, os.getpid()), self._snapshot())
+
+    def collect(self):
+        # مجموع هذا العامل وآخر لقطة لكل عامل آخر وأرشيف العمال المنتهين
+        total = _merge(_empty(), self._snapshot())
+        if self.directory:
+            own = os.path.basename(_worker_path(self.directory, os.getpid()))
+            for name in os.listdir(self.directory):
+                if name.endswith('.json') and name != own:
+                    snapshot = _read(os.path.join(self.directory, name))
+                    if snapshot is not None:
+                        _merge(total, snapshot)
+        return total
+
+    def render(self):
+        state = self.collect()
+        lines = []
+
+        def sample(name, labels, value):
+            lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+
+        def histogram(name, help_text, store, label_names):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for key, hist in sorted(store.items()):
+                values = dict(zip(label_names, key if isinstance(key, tuple) else (key,)))
+                for bound, count in zip(hist.buckets, hist.counts):
+                    sample(f'{name}_bucket', _labels(**values, le=bound), count)
+                sample(f'{name}_bucket', _labels(**values, le="+Inf"), hist.count)
+                sample(f'{name}_sum', _labels(**values), f'{hist.total:.6f}')
+                sample(f'{name}_count', _labels(**values), hist.count)
+
+        lines.append('# HELP academy_http_requests_total Requests handled, by endpoint and status')
+        lines.append('# TYPE academy_http_requests_total counter')
+        for (endpoint, method, status), count in sorted(state['requests'].items()):
+            sample('academy_http_requests_total', _labels(endpoint=endpoint, method=method, status=status), count)
+        histogram('academy_http_request_duration_seconds', 'Request latency',
+                  state['latency'], ('endpoint', 'method'))
+        histogram('academy_sql_statements_per_request', 'SQL statements executed per request',
+                  state['sql_statements'], ('endpoint',))
+        histogram('academy_sql_duration_seconds', 'Time spent in SQL per request',
+                  state['sql_time'], ('endpoint',))
+        histogram('academy_template_render_seconds', 'Template render time',
+                  state['templates'], ('template',))
+        lines.append('# HELP academy_slow_queries_total Queries slower than SLOW_QUERY_MS')
+        lines.append('# TYPE academy_slow_queries_total counter')
+        sample('academy_slow_queries_total', '', state['slow_queries'])
+
+        # المقاييس اللحظية (مثل اتصالات المجمع) للعمال الأحياء فقط
+        for name, value in sorted(state['gauges'].items()):
+            lines.append(f'# TYPE {name} gauge')
+            sample(name, '', value)
+        return '\n'.join(lines) + '\n'
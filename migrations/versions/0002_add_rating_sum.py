@@ -0,0 +1,27 @@
+"""add running rating sum to user
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('rating_sum', sa.Float(), nullable=True))
+    # تعبئة المجموع من المتوسط والعدد الحاليين (يمكن تشغيل flask rebuild-ratings لإعادة الحساب بدقة)
+    op.execute('UPDATE "user" SET rating_sum = COALESCE(rating, 0) * COALESCE(rating_count, 0)')
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('rating_sum')
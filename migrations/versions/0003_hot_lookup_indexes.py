@@ -0,0 +1,39 @@
+"""indexes for hot lookup columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_type_class_name', 'user', ['user_type', 'student_class', 'first_name', 'id'])
+    op.create_index('ix_teacher_code_subject_id', 'teacher_code', ['subject_id'])
+    op.create_index('ix_reset_token_active', 'reset_token', ['user_id', 'token'],
+                    sqlite_where=sa.text('used = 0'), postgresql_where=sa.text('used = false'))
+    op.create_index('ix_enrollment_student_id', 'enrollment', ['student_id'])
+    op.create_index('ix_assignment_submission_student_status', 'assignment_submission', ['student_id', 'status'])
+    op.create_index('ix_lecture_start_time', 'lecture', ['start_time'])
+    op.create_index('ix_rating_teacher_created', 'rating', ['teacher_id', 'created_at'])
+    op.create_index('ix_rating_student_teacher', 'rating', ['student_id', 'teacher_id'])
+
+
+def downgrade():
+    op.drop_index('ix_rating_student_teacher', table_name='rating')
+    op.drop_index('ix_rating_teacher_created', table_name='rating')
+    op.drop_index('ix_lecture_start_time', table_name='lecture')
+    op.drop_index('ix_assignment_submission_student_status', table_name='assignment_submission')
+    op.drop_index('ix_enrollment_student_id', table_name='enrollment')
+    op.drop_index('ix_reset_token_active', table_name='reset_token')
+    op.drop_index('ix_teacher_code_subject_id', table_name='teacher_code')
+    op.drop_index('ix_user_type_class_name', table_name='user')
@@ -0,0 +1,25 @@
+"""indexes for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:20:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_type_name', 'user', ['user_type', 'first_name', 'id'])
+    op.create_index('ix_teacher_code_created', 'teacher_code', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_teacher_code_created', table_name='teacher_code')
+    op.drop_index('ix_user_type_name', table_name='user')
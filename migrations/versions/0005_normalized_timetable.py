@@ -0,0 +1,101 @@
+"""replace schedule rows with a normalized timetable
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:40:00
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+PERIODS = range(1, 7)
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade():
+    op.create_table('timetable_slot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('class_level', sa.String(length=50), nullable=False),
+    sa.Column('day', sa.String(length=20), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('teacher_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['subject_id'], ['subject.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('class_level', 'day', 'period', name='uq_timetable_class_slot'),
+    sa.UniqueConstraint('teacher_id', 'day', 'period', name='uq_timetable_teacher_slot')
+    )
+
+    # نقل الجداول القديمة: آخر صف محفوظ لكل (صف، يوم) هو المعتمد، والحصة تربط بالمادة
+    # التي تحمل الاسم نفسه في الصف نفسه (النصوص التي لا تطابق مادة لا يمكن نقلها)
+    conn = op.get_bind()
+    subjects = {(level, name.strip()): subject_id for subject_id, level, name in
+                conn.execute(sa.text('SELECT id, class_level, name FROM subject'))}
+    period_columns = ', '.join(f'period{n}' for n in PERIODS)
+    latest = {}
+    for row in conn.execute(sa.text(f'SELECT class_level, day, {period_columns} FROM schedule ORDER BY id')):
+        latest[(row[0], row[1])] = row[2:]
+    slots = []
+    unmatched = []
+    for (class_level, day), periods in latest.items():
+        for period, text in zip(PERIODS, periods):
+            subject_id = subjects.get((class_level, (text or '').strip()))
+            if subject_id:
+                slots.append({'class_level': class_level, 'day': day, 'period': period,
+                              'subject_id': subject_id})
+            elif (text or '').strip():
+                unmatched.append(f'{class_level}/{day}/period{period}={text.strip()!r}')
+    if slots:
+        table = sa.table('timetable_slot', sa.column('class_level'), sa.column('day'),
+                         sa.column('period'), sa.column('subject_id'))
+        op.bulk_insert(table, slots)
+    if unmatched:
+        logger.warning('%d schedule cells match no subject and were not copied; '
+                       'they are kept in schedule_legacy: %s', len(unmatched), '; '.join(unmatched))
+
+    # الجدول القديم لا يحذف: يبقى باسم schedule_legacy حتى تراجع الخلايا التي لم تنقل
+    op.rename_table('schedule', 'schedule_legacy')
+
+
+def downgrade():
+    # الجدول القديم يعود باسمه بكل صفوفه، ويضاف الجدول الحالي صفاً أحدث لكل يوم تغير
+    # (آخر صف لكل يوم هو المعتمد). الخلايا القديمة التي لم تطابق مادة تبقى في الصف الجديد
+    op.rename_table('schedule_legacy', 'schedule')
+
+    conn = op.get_bind()
+    subjects = {(level, name.strip()) for level, name in
+                conn.execute(sa.text('SELECT class_level, name FROM subject'))}
+    period_columns = ', '.join(f'period{n}' for n in PERIODS)
+    legacy = {}
+    for row in conn.execute(sa.text(f'SELECT class_level, day, {period_columns} FROM schedule ORDER BY id')):
+        legacy[(row[0], row[1])] = dict(zip((f'period{n}' for n in PERIODS), row[2:]))
+
+    days = {}
+    for class_level, day, period, name in conn.execute(sa.text(
+            'SELECT t.class_level, t.day, t.period, s.name FROM timetable_slot t '
+            'JOIN subject s ON s.id = t.subject_id')):
+        days.setdefault((class_level, day), {})[f'period{period}'] = name
+    rows = []
+    for (class_level, day), periods in days.items():
+        old = legacy.get((class_level, day), {})
+        for column, text in old.items():
+            if column not in periods and text and (class_level, text.strip()) not in subjects:
+                periods[column] = text
+        if any(old.get(column) != periods.get(column) for column in set(old) | set(periods)):
+            rows.append(dict(periods, class_level=class_level, day=day))
+    if rows:
+        table = sa.table('schedule', sa.column('class_level'), sa.column('day'),
+                         *[sa.column(f'period{n}') for n in PERIODS])
+        op.bulk_insert(table, rows)
+
+    op.drop_table('timetable_slot')
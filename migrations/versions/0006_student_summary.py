@@ -0,0 +1,37 @@
+"""materialized student dashboard counters
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('student_summary',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('enrolled_courses', sa.Integer(), nullable=False),
+    sa.Column('completed_assignments', sa.Integer(), nullable=False),
+    sa.Column('upcoming_lectures', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('student_id')
+    )
+    # الملخصات تحسب عند أول زيارة لكل طالب، أو دفعة واحدة بـ flask rebuild-student-summaries
+    op.create_index('ix_enrollment_course_id', 'enrollment', ['course_id'])
+    op.create_index('ix_lecture_course_start', 'lecture', ['course_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_lecture_course_start', table_name='lecture')
+    op.drop_index('ix_enrollment_course_id', table_name='enrollment')
+    op.drop_table('student_summary')
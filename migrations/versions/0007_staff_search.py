@@ -0,0 +1,91 @@
+"""full-text staff search index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 10:30:00
+
+"""
+import re
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE staff_search_fts USING fts5("
+    "document, content='staff_search', content_rowid='user_id', tokenize='unicode61', prefix='2 3')",
+    "CREATE VIRTUAL TABLE staff_search_fts_vocab USING fts5vocab(staff_search_fts, 'row')",
+    "CREATE TRIGGER staff_search_fts_ai AFTER INSERT ON staff_search BEGIN "
+    "INSERT INTO staff_search_fts(rowid, document) VALUES (new.user_id, new.document); END",
+    "CREATE TRIGGER staff_search_fts_ad AFTER DELETE ON staff_search BEGIN "
+    "INSERT INTO staff_search_fts(staff_search_fts, rowid, document) VALUES ('delete', old.user_id, old.document); END",
+    "CREATE TRIGGER staff_search_fts_au AFTER UPDATE ON staff_search BEGIN "
+    "INSERT INTO staff_search_fts(staff_search_fts, rowid, document) VALUES ('delete', old.user_id, old.document); "
+    "INSERT INTO staff_search_fts(rowid, document) VALUES (new.user_id, new.document); END",
+]
+
+# نسخة ثابتة من قواعد التطبيع في staff_search.py وقت كتابة هذا الترحيل
+DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+LETTERS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ة': 'ه', 'ى': 'ي', 'ؤ': 'و', 'ئ': 'ي',
+                         'ی': 'ي', 'ک': 'ك'})
+
+
+def document(*fields):
+    value = unicodedata.normalize('NFKC', ' '.join(field or '' for field in fields))
+    words = []
+    for token in re.findall(r'\w+', DIACRITICS.sub('', value).translate(LETTERS).lower()):
+        words.append(token)
+        if token.startswith('ال') and len(token) > 3:
+            words.append(token[2:])
+    return ' '.join(dict.fromkeys(words))
+
+
+def upgrade():
+    conn = op.get_bind()
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.create_table('staff_search',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('user_type', sa.String(length=20), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=True),
+    sa.Column('class_level', sa.String(length=50), nullable=True),
+    sa.Column('document', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['subject_id'], ['subject.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_staff_search_type_class', 'staff_search', ['user_type', 'class_level'])
+    op.create_index('ix_staff_search_subject', 'staff_search', ['subject_id'])
+    if dialect == 'postgresql':
+        op.execute("CREATE INDEX ix_staff_search_document_tsv ON staff_search "
+                   "USING gin (to_tsvector('simple', document))")
+        op.execute('CREATE INDEX ix_staff_search_document_trgm ON staff_search USING gin (document gin_trgm_ops)')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+
+    rows = conn.execute(sa.text(
+        "SELECT u.id, u.user_type, u.subject_id, s.class_level, u.first_name, u.last_name, u.specialization, s.name "
+        "FROM \"user\" u LEFT JOIN subject s ON s.id = u.subject_id WHERE u.user_type IN ('teacher', 'tutor')"
+    )).all()
+    if rows:
+        table = sa.table('staff_search', sa.column('user_id'), sa.column('user_type'), sa.column('subject_id'),
+                         sa.column('class_level'), sa.column('document'))
+        op.bulk_insert(table, [{'user_id': user_id, 'user_type': user_type, 'subject_id': subject_id,
+                                'class_level': class_level, 'document': document(*fields)}
+                               for user_id, user_type, subject_id, class_level, *fields in rows])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS staff_search_fts_vocab')
+        op.execute('DROP TABLE IF EXISTS staff_search_fts')
+    op.drop_table('staff_search')
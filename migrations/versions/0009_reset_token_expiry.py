@@ -0,0 +1,48 @@
+"""one expiring reset token per user
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 11:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+# الرموز صالحة 30 دقيقة فقط، فيعاد إنشاء الجدول بدل نقل صفوفه (من لديه رمز قائم يطلب رمزاً جديداً)
+
+def upgrade():
+    op.drop_table('reset_token')
+    op.create_table('reset_token',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=6), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_reset_token_user', 'reset_token', ['user_id'], unique=True)
+    op.create_index('ix_reset_token_expires', 'reset_token', ['expires_at'])
+
+
+def downgrade():
+    op.drop_table('reset_token')
+    op.create_table('reset_token',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=6), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('used', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reset_token_active', 'reset_token', ['user_id', 'token'],
+                    sqlite_where=sa.text('used = 0'), postgresql_where=sa.text('used = false'))
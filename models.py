@@ -0,0 +1,212 @@
+from datetime import datetime, timezone
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import UserMixin
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash, check_password_hash
+
+db = SQLAlchemy()
+
+# نماذج قاعدة البيانات
+class User(UserMixin, db.Model):
+    __table_args__ = (
+        # قوائم الطلاب حسب الصف مرتبة بالاسم، وقوائم المدرسين حسب النوع
+        db.Index('ix_user_type_class_name', 'user_type', 'student_class', 'first_name', 'id'),
+        db.Index('ix_user_type_name', 'user_type', 'first_name', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    first_name = db.Column(db.String(50), nullable=False)
+    last_name = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    username = db.Column(db.String(50), unique=True, nullable=False)
+    password_hash = db.Column(db.String(128), nullable=False)
+    user_type = db.Column(db.String(20), nullable=False)
+    student_class = db.Column(db.String(50))
+    specialization = db.Column(db.String(100))
+    hourly_rate = db.Column(db.Float)
+    rating = db.Column(db.Float, default=0.0)
+    rating_sum = db.Column(db.Float, default=0.0)
+    rating_count = db.Column(db.Integer, default=0)
+    bio = db.Column(db.Text)
+    image = db.Column(db.String(100))
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'))
+    subject = db.relationship('Subject', backref=db.backref('teachers', lazy=True))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # يزيد مع كل تعديل (انظر _bump_version أدناه) وتشتق منه ETag في واجهة JSON
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    def set_password(self, password):
+        self.password_hash = generate_password_hash(password)
+
+    def check_password(self, password):
+        return check_password_hash(self.password_hash, password)
+
+# كل تعديل على المستخدم عبر ORM يزيد رقم النسخة داخل عبارة UPDATE نفسها، أينما حدث
+# (الويب، أوامر flask، العمال)، والتحديثات المباشرة مثل add_teacher_rating تزيده صراحة
+@event.listens_for(User, 'before_update')
+def _bump_version(mapper, connection, target):
+    target.version = User.version + 1
+
+class Subject(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    class_level = db.Column(db.String(50), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    code = db.Column(db.String(20), unique=True, nullable=False, default='')
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class TeacherCode(db.Model):
+    __table_args__ = (
+        db.Index('ix_teacher_code_subject_id', 'subject_id'),
+        db.Index('ix_teacher_code_created', 'created_at', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(20), unique=True, nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    used = db.Column(db.Boolean, default=False)
+    subject = db.relationship('Subject', backref=db.backref('codes', lazy=True))
+
+class ResetToken(db.Model):
+    __table_args__ = (
+        # رمز واحد صالح لكل مستخدم: طلب رمز جديد يستبدل القديم، والتحقق قراءة بالمفتاح
+        db.Index('uq_reset_token_user', 'user_id', unique=True),
+        # حذف الرموز المنتهية على دفعات
+        db.Index('ix_reset_token_expires', 'expires_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    token = db.Column(db.String(6), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    expires_at = db.Column(db.DateTime, nullable=False)
+    user = db.relationship('User', backref=db.backref('reset_tokens', lazy=True, passive_deletes=True))
+
+# صندوق البريد الصادر: الرسالة تبقى صفاً حتى يرسلها أحد العمال، فلا تضيع عند إعادة تشغيله
+class MailOutbox(db.Model):
+    __table_args__ = (
+        # العمال يحجزون الرسائل المستحقة بترتيب موعدها
+        db.Index('ix_mail_outbox_next_attempt', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # موعد المحاولة التالية، ويؤجل عند الحجز حتى لا يأخذ عامل آخر الرسالة نفسها
+    next_attempt_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+# حصة واحدة في الجدول الأسبوعي: صف ويوم ورقم حصة، مع المادة والمدرس
+class TimetableSlot(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('class_level', 'day', 'period', name='uq_timetable_class_slot'),
+        # المدرس لا يكون في صفين في الحصة نفسها (الفهرس يستخدم أيضاً لكشف التعارض)
+        db.UniqueConstraint('teacher_id', 'day', 'period', name='uq_timetable_teacher_slot'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    class_level = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.String(20), nullable=False)
+    period = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    subject = db.relationship('Subject')
+    teacher = db.relationship('User')
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+class Course(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    class_level = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class Enrollment(db.Model):
+    __table_args__ = (
+        db.Index('ix_enrollment_student_id', 'student_id'),
+        db.Index('ix_enrollment_course_id', 'course_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    # active_history: القيمة القديمة تحمل عند التعديل حتى تحدث عدادات StudentSummary بدقة
+    student_id = db.column_property(db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False),
+                                    active_history=True)
+    course_id = db.column_property(db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False),
+                                   active_history=True)
+    enrollment_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    course = db.relationship('Course', backref=db.backref('enrollments', lazy=True))
+
+class Assignment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    due_date = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    course = db.relationship('Course', backref=db.backref('assignments', lazy=True))
+
+class AssignmentSubmission(db.Model):
+    __table_args__ = (
+        db.Index('ix_assignment_submission_student_status', 'student_id', 'status'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    assignment_id = db.Column(db.Integer, db.ForeignKey('assignment.id'), nullable=False)
+    student_id = db.column_property(db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False),
+                                    active_history=True)
+    submission_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    status = db.column_property(db.Column(db.String(20), default='submitted'), active_history=True)
+    assignment = db.relationship('Assignment', backref=db.backref('submissions', lazy=True))
+
+class Lecture(db.Model):
+    __table_args__ = (
+        db.Index('ix_lecture_start_time', 'start_time'),
+        db.Index('ix_lecture_course_start', 'course_id', 'start_time'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.column_property(db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False),
+                                   active_history=True)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    start_time = db.column_property(db.Column(db.DateTime), active_history=True)
+    end_time = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    course = db.relationship('Course', backref=db.backref('lectures', lazy=True))
+
+# عدادات لوحة الطالب محسوبة مسبقاً وتحدث مع كل تسجيل أو تسليم أو محاضرة
+class StudentSummary(db.Model):
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    enrolled_courses = db.Column(db.Integer, nullable=False, default=0)
+    completed_assignments = db.Column(db.Integer, nullable=False, default=0)
+    upcoming_lectures = db.Column(db.Integer, nullable=False, default=0)
+    # وقت آخر حساب كامل لنافذة المحاضرات القادمة (تتحرك مع الزمن)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+
+# فهرس البحث عن المدرسين: نص مطبع لكل مدرس (الاسم، التخصص، المادة) مع أعمدة التصفية.
+# في SQLite يفهرس بجدول FTS5 (ينشأ في staff_search.py)، وفي PostgreSQL بفهارس GIN أدناه
+class StaffSearch(db.Model):
+    __tablename__ = 'staff_search'
+    __table_args__ = (
+        db.Index('ix_staff_search_type_class', 'user_type', 'class_level'),
+        db.Index('ix_staff_search_subject', 'subject_id'),
+        db.Index('ix_staff_search_document_tsv',
+                 db.func.to_tsvector(db.literal_column("'simple'"), db.literal_column('document')),
+                 postgresql_using='gin', info={'dialect': 'postgresql'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_staff_search_document_trgm', 'document', postgresql_using='gin',
+                 postgresql_ops={'document': 'gin_trgm_ops'},
+                 info={'dialect': 'postgresql'}).ddl_if(dialect='postgresql'),
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    user_type = db.Column(db.String(20), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id', ondelete='SET NULL'))
+    # صف مادة المدرس؛ فارغ للمدرسين الخصوصيين لأنهم يدرسون كل الصفوف
+    class_level = db.Column(db.String(50))
+    document = db.Column(db.Text, nullable=False)
+
+class Rating(db.Model):
+    __table_args__ = (
+        db.Index('ix_rating_teacher_created', 'teacher_id', 'created_at'),
+        db.Index('ix_rating_student_teacher', 'student_id', 'teacher_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    rating = db.Column(db.Float, nullable=False)
+    comment = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    student = db.relationship('User', foreign_keys=[student_id])
@@ -0,0 +1,108 @@
+import hashlib
+import os
+from functools import wraps
+from flask import Response, make_response, request, session
+from werkzeug.http import parse_cookie
+
+
+# تخزين الصفحات العامة كاملة للزوار غير المسجلين (الرئيسية والشروط).
+# الطلب بدون كوكي جلسة يخدم من الذاكرة المؤقتة قبل الوصول إلى Flask نفسه (بدون Flask-Login
+# وCSRF والقالب)، والطلب بكوكي جلسة لا تحمل مستخدماً يخدم من المسار نفسه داخل Flask.
+# المفتاح يحمل بصمة القوالب وملفات static، فأي نشر يغيرها يبدأ بمفاتيح جديدة.
+# الطلب مع نص استعلام (?...) لا يخزن ولا يخدم من الذاكرة المؤقتة، فالمفاتيح مسار الصفحة فقط
+# ولا تنشئ عناوين عشوائية مدخلات جديدة بلا حد
+class PageCache:
+    def __init__(self, app=None, cache=None):
+        self.cache = None
+        self.enabled = True
+        self.ttl = 3600
+        self.max_age = 300
+        self.build_id = ''
+        self.session_cookie = 'session'
+        self.remember_cookie = 'remember_token'
+        # المسارات التي خزنت صفحاتها في هذا العامل، فلا تفحص الذاكرة المؤقتة لغيرها
+        self.paths = set()
+        if app is not None:
+            self.init_app(app, cache)
+
+    def init_app(self, app, cache):
+        app.config.setdefault('PAGE_CACHE_ENABLED', os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True')
+        app.config.setdefault('PAGE_CACHE_TTL', int(os.environ.get('PAGE_CACHE_TTL', 3600)))
+        # مدة التخزين في المتصفح وفي CDN أو nginx أمام التطبيق
+        app.config.setdefault('PAGE_CACHE_MAX_AGE', int(os.environ.get('PAGE_CACHE_MAX_AGE', 300)))
+        self.cache = cache
+        self.enabled = app.config['PAGE_CACHE_ENABLED']
+        self.ttl = app.config['PAGE_CACHE_TTL']
+        self.max_age = app.config['PAGE_CACHE_MAX_AGE']
+        self.session_cookie = app.config['SESSION_COOKIE_NAME']
+        self.remember_cookie = app.config.get('REMEMBER_COOKIE_NAME', 'remember_token')
+        self.build_id = self._build_id(app)
+        app.wsgi_app = self._middleware(app.wsgi_app)
+        app.extensions['page_cache'] = self
+
+    @staticmethod
+    def _build_id(app):
+        digest = hashlib.sha1()
+        for root, _, files in sorted(os.walk(os.path.join(app.root_path, app.template_folder))):
+            for name in sorted(files):
+                with open(os.path.join(root, name), 'rb') as f:
+                    digest.update(name.encode() + f.read())
+        manifest = app.extensions.get('static_manifest')
+        if manifest is not None:
+            digest.update(repr(sorted(manifest.hashes.items())).encode())
+        return digest.hexdigest()[:12]
+
+    def key(self, path):
+        return f'page:{self.build_id}:{path}'
+
+    def _response(self, entry):
+        body, content_type, etag = entry
+        response = Response(body, content_type=content_type)
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.vary.add('Cookie')
+        return response
+
+    def _middleware(self, wsgi_app):
+        def middleware(environ, start_response):
+            path = environ.get('PATH_INFO', '')
+            if (self.enabled and path in self.paths and environ['REQUEST_METHOD'] in ('GET', 'HEAD')
+                    and not environ.get('QUERY_STRING') and not self._has_login_cookies(parse_cookie(environ))):
+                entry = self.cache.get(self.key(path))
+                if entry is not None:
+                    return self._response(entry).make_conditional(environ)(environ, start_response)
+            return wsgi_app(environ, start_response)
+        return middleware
+
+    def _has_login_cookies(self, cookies):
+        return self.session_cookie in cookies or self.remember_cookie in cookies
+
+    def _anonymous(self):
+        # الجلسة تقرأ من الكوكي نفسه دون تحميل المستخدم، ورسائل flash تعرض مرة واحدة فلا تخزن
+        return ('_user_id' not in session and '_flashes' not in session
+                and self.remember_cookie not in request.cookies)
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or request.method not in ('GET', 'HEAD') or request.query_string:
+                return view(*args, **kwargs)
+            if not self._anonymous():
+                response = make_response(view(*args, **kwargs))
+                response.cache_control.private = True
+                return response
+
+            self.paths.add(request.path)
+            key = self.key(request.path)
+            entry = self.cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                # صفحة عدلت الجلسة (مثل رمز CSRF) تحتاج Set-Cookie خاصاً بالزائر فلا تخزن
+                if response.status_code != 200 or session.modified:
+                    return response
+                body = response.get_data()
+                entry = (body, response.content_type, hashlib.sha1(body).hexdigest())
+                self.cache.set(key, entry, self.ttl)
+            return self._response(entry).make_conditional(request)
+        return wrapper
@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime
+from flask import request, url_for
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+# صفحة نتائج بمؤشرات (keyset) بدل OFFSET: كل صفحة تبدأ بعد آخر مفتاح في الصفحة السابقة
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def map(self, fn):
+        return KeysetPage([fn(item) for item in self.items], self.next_cursor, self.prev_cursor)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+def _decode_value(value, python_type):
+    # قيمة المؤشر يجب أن تطابق نوع عمودها، وإلا يرفض المؤشر بدل أن يفشل الاستعلام
+    if value is None:
+        return None
+    if python_type is datetime:
+        if isinstance(value, dict) and set(value) == {'dt'} and isinstance(value['dt'], str):
+            return datetime.fromisoformat(value['dt'])
+        raise ValueError('expected a datetime')
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        raise ValueError(f'expected {python_type.__name__}')
+    return value
+
+def encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, types):
+    # types: نوع Python لكل عمود في المفتاح. المؤشر المعدل أو التالف يعامل كأنه غير موجود
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            return None
+        return tuple(_decode_value(value, python_type) for value, python_type in zip(values, types))
+    except (ValueError, TypeError):
+        return None
+
+
+def page_size(default=DEFAULT_PAGE_SIZE):
+    per_page = request.args.get('per_page', default, type=int)
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def keyset_paginate(query, columns, after=None, before=None, per_page=DEFAULT_PAGE_SIZE, descending=False):
+    keys = tuple_(*columns)
+    types = tuple(column.type.python_type for column in columns)
+
+    def cursor_of(row):
+        return encode_cursor([getattr(row, column.key) for column in columns])
+
+    before_values = decode_cursor(before, types) if before else None
+    if before_values:
+        # الرجوع للخلف: نقرأ بالترتيب المعكوس ثم نعيد ترتيب الصفحة
+        condition = keys > before_values if descending else keys < before_values
+        order = [column.asc() if descending else column.desc() for column in columns]
+        rows = query.filter(condition).order_by(*order).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return KeysetPage(rows,
+                          next_cursor=cursor_of(rows[-1]) if rows else None,
+                          prev_cursor=cursor_of(rows[0]) if has_more else None)
+
+    after_values = decode_cursor(after, types) if after else None
+    if after_values:
+        query = query.filter(keys < after_values if descending else keys > after_values)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    return KeysetPage(rows,
+                      next_cursor=cursor_of(rows[-1]) if has_more else None,
+                      prev_cursor=cursor_of(rows[0]) if after_values and rows else None)
+
+
+# رابط الصفحة التالية/السابقة مع الإبقاء على بقية معاملات الرابط الحالي
+def page_url(cursor, direction, prefix=''):
+    args = request.args.to_dict()
+    args.pop(prefix + 'after', None)
+    args.pop(prefix + 'before', None)
+    args[prefix + direction] = cursor
+    return url_for(request.endpoint, **request.view_args, **args)
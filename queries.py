@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import joinedload
+from models import User, TeacherCode, Enrollment, Assignment, AssignmentSubmission, Lecture, Rating
+from pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+
+
+# استعلامات الصفحات مع تحميل العلاقات مسبقاً حتى لا يطلق القالب استعلاماً لكل صف
+# والقوائم الطويلة تقسم إلى صفحات بمؤشرات (after/before)
+
+def staff_with_subject(user_type, limit=None):
+    query = User.query.options(joinedload(User.subject)).filter_by(user_type=user_type)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def staff_by_ids(ids):
+    if not ids:
+        return []
+    return User.query.options(joinedload(User.subject)).filter(User.id.in_(ids)).all()
+
+def staff_page(user_type, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    query = User.query.options(joinedload(User.subject)).filter_by(user_type=user_type)
+    return keyset_paginate(query, [User.first_name, User.id], after, before, per_page)
+
+def students_in_class_page(class_level, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    query = User.query.filter_by(user_type='student', student_class=class_level)
+    return keyset_paginate(query, [User.first_name, User.id], after, before, per_page)
+
+def teacher_codes_page(after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    query = TeacherCode.query.options(joinedload(TeacherCode.subject))
+    return keyset_paginate(query, [TeacherCode.created_at, TeacherCode.id], after, before, per_page,
+                           descending=True)
+
+def student_enrollments(student_id, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    query = Enrollment.query.options(joinedload(Enrollment.course)).filter_by(student_id=student_id)
+    return keyset_paginate(query, [Enrollment.enrollment_date, Enrollment.id], after, before, per_page,
+                           descending=True)
+
+def completed_submissions(student_id, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    query = AssignmentSubmission.query \
+        .options(joinedload(AssignmentSubmission.assignment).joinedload(Assignment.course)) \
+        .filter_by(student_id=student_id, status='completed')
+    return keyset_paginate(query, [AssignmentSubmission.submission_date, AssignmentSubmission.id],
+                           after, before, per_page, descending=True)
+
+def upcoming_lectures(days=7, after=None, before=None, per_page=DEFAULT_PAGE_SIZE, student_id=None):
+    now = datetime.now(timezone.utc)
+    query = Lecture.query.options(joinedload(Lecture.course)).filter(
+        Lecture.start_time > now,
+        Lecture.start_time < now + timedelta(days=days)
+    )
+    if student_id is not None:
+        # محاضرات المواد التي سجل فيها الطالب فقط
+        query = query.filter(Lecture.course_id.in_(
+            Enrollment.query.with_entities(Enrollment.course_id).filter_by(student_id=student_id)
+        ))
+    return keyset_paginate(query, [Lecture.start_time, Lecture.id], after, before, per_page)
+
+def teacher_reviews(teacher_id, page, per_page=10):
+    return Rating.query.filter_by(teacher_id=teacher_id) \
+        .options(joinedload(Rating.student)) \
+        .order_by(Rating.created_at.desc(), Rating.id.desc()) \
+        .paginate(page=page, per_page=per_page, error_out=False)
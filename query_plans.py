@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, text
+from models import (db, User, TeacherCode, ResetToken, Enrollment, AssignmentSubmission, Lecture, Rating,
+                    TimetableSlot, StaffSearch)
+
+
+# الاستعلامات الأكثر تكراراً في التطبيق، ويجب أن يستخدم كل منها فهرساً
+def hot_queries():
+    now = datetime.now(timezone.utc)
+    return {
+        'staff by type': select(User).filter_by(user_type='tutor').order_by(User.first_name, User.id),
+        'students by class': select(User).filter_by(user_type='student', student_class='first_intermediate')
+            .order_by(User.first_name),
+        'ratings by teacher': select(Rating).filter_by(teacher_id=1).order_by(Rating.created_at.desc()),
+        'rating by student': select(Rating).filter_by(teacher_id=1, student_id=2),
+        'enrollments by student': select(Enrollment).filter_by(student_id=1),
+        'submissions by student': select(AssignmentSubmission).filter_by(student_id=1, status='completed'),
+        'lectures by start time': select(Lecture).filter(Lecture.start_time > now,
+                                                         Lecture.start_time < now + timedelta(days=7)),
+        'reset token': select(ResetToken).filter(ResetToken.user_id == 1, ResetToken.token == 'ABCDE',
+                                                 ResetToken.expires_at > now),
+        'expired reset tokens': select(ResetToken.id).filter(ResetToken.expires_at < now)
+            .order_by(ResetToken.expires_at).limit(1000),
+        'codes by subject': select(TeacherCode).filter_by(subject_id=1),
+        'codes by date': select(TeacherCode).order_by(TeacherCode.created_at.desc(), TeacherCode.id.desc())
+            .limit(25),
+        'timetable by class': select(TimetableSlot).filter_by(class_level='first_intermediate'),
+        'timetable by teacher': select(TimetableSlot).filter_by(teacher_id=1),
+        'search filters': select(StaffSearch).filter_by(user_type='teacher', class_level='first_intermediate'),
+        'search by subject': select(StaffSearch).filter_by(subject_id=1),
+    }
+
+
+def explain(statement):
+    conn = db.session.connection()
+    dialect = conn.dialect.name
+    compiled = statement.compile(dialect=conn.dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    if dialect == 'sqlite':
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).all()
+        return [row[-1] for row in rows]
+
+    # في PostgreSQL نمنع المسح التسلسلي حتى يظهر ما إذا كان هناك فهرس قابل للاستخدام
+    # (الجداول الصغيرة في بيئة الاختبار تجعل المخطط يفضل المسح الكامل دائماً)
+    conn.execute(text('SET LOCAL enable_seqscan = off'))
+    rows = conn.exec_driver_sql('EXPLAIN ' + str(compiled), params).all()
+    return [row[0] for row in rows]
+
+
+def is_full_scan(line):
+    if line.startswith('SCAN '):
+        return 'USING' not in line
+    return 'Seq Scan' in line
+
+
+def check_hot_queries():
+    failures = {}
+    for name, statement in hot_queries().items():
+        plan = explain(statement)
+        if any(is_full_scan(line) for line in plan):
+            failures[name] = plan
+    db.session.rollback()
+    return failures
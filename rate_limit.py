@@ -0,0 +1,145 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import render_template, request
+
+# (السعة، المدة بالثواني): السعة محاولات متتالية، وتعود بالكامل خلال المدة
+DEFAULT_LIMITS = {
+    'login': {'ip': (20, 60), 'identifier': (5, 300)},
+    'forgot_password': {'ip': (5, 900), 'identifier': (3, 3600)},
+    'reset_password': {'ip': (10, 900), 'identifier': (5, 900)},
+}
+
+# كل الدلاء تفحص في استدعاء واحد: إذا رفض أحدها لا يخصم من الباقي،
+# ويعاد أطول وقت انتظار بالملي ثانية
+TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local states = {}
+local retry = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        retry = math.max(retry, math.ceil((1 - tokens) / rate))
+    end
+    states[i] = {tokens, capacity, rate}
+end
+for i, key in ipairs(KEYS) do
+    local tokens, capacity, rate = states[i][1], states[i][2], states[i][3]
+    if retry == 0 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return retry
+"""
+
+
+# نفس الخوارزمية داخل العملية عند تعذر Redis (الحد يصبح لكل عامل على حدة)
+class LocalBuckets:
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, now, buckets):
+        with self._lock:
+            states = []
+            retry = 0
+            for key, capacity, rate in buckets:
+                tokens, ts = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + max(0, now - ts) * rate)
+                if tokens < 1:
+                    retry = max(retry, math.ceil((1 - tokens) / rate))
+                states.append((key, tokens))
+            for key, tokens in states:
+                self._buckets[key] = (tokens - 1 if retry == 0 else tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+            return retry
+
+
+# تحديد معدل المحاولات للصفحات المتاحة بدون تسجيل دخول: دلو رموز لكل عنوان IP
+# ولكل معرف (بريد أو اسم مستخدم). الفحص يتم قبل أي استعلام أو تجزئة كلمة مرور
+class RateLimiter:
+    def __init__(self, app=None, cache=None):
+        self.cache = None
+        self.limits = DEFAULT_LIMITS
+        self.enabled = True
+        self.proxy_count = 0
+        self.local = LocalBuckets()
+        self._script = None
+        if app is not None:
+            self.init_app(app, cache)
+
+    def init_app(self, app, cache):
+        app.config.setdefault('RATE_LIMITS', DEFAULT_LIMITS)
+        app.config.setdefault('RATE_LIMIT_ENABLED', os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True')
+        # عدد الوكلاء العكسيين أمام التطبيق، لقراءة عنوان العميل الحقيقي من X-Forwarded-For
+        app.config.setdefault('RATE_LIMIT_PROXY_COUNT', int(os.environ.get('RATE_LIMIT_PROXY_COUNT', 0)))
+        self.cache = cache
+        self.limits = app.config['RATE_LIMITS']
+        self.enabled = app.config['RATE_LIMIT_ENABLED']
+        self.proxy_count = app.config['RATE_LIMIT_PROXY_COUNT']
+        app.extensions['rate_limiter'] = self
+
+    def client_ip(self):
+        # آخر الوكلاء الموثوقين يضيف عنوان العميل في نهاية X-Forwarded-For، وما قبله قد يكون مزوراً
+        route = request.access_route
+        if self.proxy_count and request.headers.get('X-Forwarded-For') and len(route) >= self.proxy_count:
+            return route[-self.proxy_count]
+        return request.remote_addr
+
+    def _key(self, scope, kind, value):
+        # المعرفات تخزن مجزأة حتى لا تظهر عناوين البريد في مفاتيح Redis
+        digest = hashlib.sha1(value.strip().lower().encode()).hexdigest()
+        return f'{self.cache.prefix}ratelimit:{scope}:{kind}:{digest}'
+
+    def hit(self, scope, identifier=None):
+        # يعيد 0 إذا سمح بالمحاولة، أو عدد الثواني المطلوب انتظارها
+        buckets = []
+        for kind, value in (('ip', self.client_ip()), ('identifier', identifier)):
+            if value and kind in self.limits[scope]:
+                capacity, period = self.limits[scope][kind]
+                buckets.append((self._key(scope, kind, value), capacity, capacity / (period * 1000)))
+        if not buckets:
+            return 0
+        now = int(time.time() * 1000)
+
+        client = self.cache.redis()
+        if client is not None:
+            try:
+                if self._script is None or self._script.registered_client is not client:
+                    self._script = client.register_script(TOKEN_BUCKET_LUA)
+                args = [now]
+                for _, capacity, rate in buckets:
+                    args += [capacity, rate]
+                retry_ms = int(self._script(keys=[key for key, _, _ in buckets], args=args))
+                return math.ceil(retry_ms / 1000)
+            except self.cache.errors as e:
+                self.cache.redis_failed(e)
+        return math.ceil(self.local.take(now, buckets) / 1000)
+
+    def limit(self, scope, identifier=lambda: None):
+        # يطبق على طلبات POST فقط، فعرض النموذج لا يستهلك من الحد
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.enabled and request.method == 'POST':
+                    retry_after = self.hit(scope, identifier())
+                    if retry_after:
+                        return (render_template('rate_limited.html', retry_after=retry_after), 429,
+                                {'Retry-After': str(retry_after)})
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
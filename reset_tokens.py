@@ -0,0 +1,62 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from models import db, ResetToken
+
+TOKEN_TTL = timedelta(minutes=30)
+PURGE_BATCH_SIZE = 1000
+
+
+def new_token():
+    # رمز من 5 خانات سداسية
+    return secrets.token_hex(3).upper()[:5]
+
+
+# رمز واحد لكل مستخدم مع وقت انتهاء مخزن في الصف نفسه: الجدول لا يكبر مع كل طلب استعادة،
+# والرموز المنتهية تحذف دورياً بـ purge_expired
+def issue(user_id, attempts=3):
+    for attempt in range(attempts):
+        token = new_token()
+        now = datetime.now(timezone.utc)
+        db.session.execute(delete(ResetToken).where(ResetToken.user_id == user_id))
+        db.session.add(ResetToken(user_id=user_id, token=token, created_at=now, expires_at=now + TOKEN_TTL))
+        try:
+            db.session.commit()
+            return token
+        except IntegrityError:
+            # طلب آخر للمستخدم نفسه أدرج رمزاً بين الحذف والإدراج
+            db.session.rollback()
+            if attempt == attempts - 1:
+                raise
+
+
+def consume(user_id, token):
+    # التحقق والإبطال في عبارة DELETE واحدة بالمفتاح، فلا يستعمل الرمز مرتين حتى مع طلبين متزامنين.
+    # لا يحفظ: يحفظ مع كلمة المرور الجديدة في المعاملة نفسها
+    result = db.session.execute(
+        delete(ResetToken)
+        .where(ResetToken.user_id == user_id, ResetToken.token == token,
+               ResetToken.expires_at > datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def purge_expired(batch_size=PURGE_BATCH_SIZE):
+    # دفعات صغيرة بمعاملة لكل دفعة، فلا يقفل الجدول طويلاً أثناء طلبات الاستعادة
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(ResetToken.id).where(ResetToken.expires_at < now)
+            .order_by(ResetToken.expires_at).limit(batch_size)
+        ).all()
+        if not ids:
+            return total
+        db.session.execute(delete(ResetToken).where(ResetToken.id.in_(ids))
+                           .execution_options(synchronize_session=False))
+        db.session.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            return total
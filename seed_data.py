@@ -0,0 +1,171 @@
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+from models import (db, User, Subject, TeacherCode, Course, Enrollment, Assignment, AssignmentSubmission,
+                    Lecture, Rating)
+
+CLASS_LEVELS = ['first_intermediate', 'second_intermediate', 'third_intermediate',
+                'fourth_science', 'fourth_literature', 'fifth_science',
+                'fifth_literature', 'sixth_science', 'sixth_literature']
+SUBJECT_NAMES = ['الرياضيات', 'الفيزياء', 'الكيمياء', 'الأحياء', 'اللغة العربية', 'اللغة الإنكليزية',
+                 'التاريخ', 'الجغرافية', 'التربية الإسلامية']
+FIRST_NAMES = ['محمد', 'أحمد', 'علي', 'حسين', 'زينب', 'فاطمة', 'مريم', 'سارة', 'عمر', 'يوسف',
+               'نور', 'هدى', 'إبراهيم', 'آمنة', 'عبدالله', 'ليلى', 'مصطفى', 'رقية', 'حسن', 'جعفر']
+LAST_NAMES = ['العبيدي', 'الجبوري', 'الموسوي', 'الحسيني', 'التميمي', 'الربيعي', 'الزبيدي',
+              'الخفاجي', 'الساعدي', 'الدليمي', 'العزاوي', 'الشمري']
+SPECIALIZATIONS = ['رياضيات', 'فيزياء', 'كيمياء', 'أحياء', 'لغة عربية', 'لغة إنكليزية']
+COMMENTS = ['شرح واضح ومفيد', 'مدرس ممتاز', 'يحتاج إلى تنظيم أكثر', 'أنصح به بشدة', None]
+
+BATCH_SIZE = 5000
+
+
+def _next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def _sync_sequences(models):
+    # المعرفات أدرجت صراحة، فنحدث تسلسلات PostgreSQL حتى لا تتعارض الإدراجات اللاحقة
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"
+        ))
+
+
+# توليد بيانات أكاديمية تجريبية بحجم قابل للضبط لاختبارات الحمل والقياس
+def seed(students=50000, teachers=200, tutors=2000, ratings_per_tutor=10, courses_per_student=5,
+         lectures_per_course=20, assignments_per_course=10, submissions_per_student=5, seed_value=42):
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+    # كل المستخدمين التجريبيين يشتركون في كلمة المرور "password" (تجزئة واحدة توفر وقت التوليد)
+    password_hash = generate_password_hash('password')
+    counts = {}
+
+    subject_id = _next_id(Subject)
+    subjects = []
+    for level in CLASS_LEVELS:
+        for name in SUBJECT_NAMES:
+            subjects.append({'id': subject_id, 'class_level': level, 'name': name,
+                             'code': f'S{subject_id:05d}', 'created_at': now})
+            subject_id += 1
+    _bulk_insert(Subject, subjects)
+    counts['subjects'] = len(subjects)
+
+    code_id = _next_id(TeacherCode)
+    codes = []
+    for subject in subjects:
+        for _ in range(5):
+            codes.append({'id': code_id, 'code': f'T{code_id:07d}', 'subject_id': subject['id'],
+                          'used': rng.random() < 0.5, 'created_at': now - timedelta(days=rng.randint(0, 120))})
+            code_id += 1
+    _bulk_insert(TeacherCode, codes)
+    counts['teacher_codes'] = len(codes)
+
+    user_id = _next_id(User)
+
+    def make_user(user_type, **extra):
+        nonlocal user_id
+        row = {'id': user_id, 'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+               'email': f'{user_type}{user_id}@seed.academy', 'username': f'{user_type}{user_id}',
+               'password_hash': password_hash, 'user_type': user_type,
+               'rating': 0.0, 'rating_sum': 0.0, 'rating_count': 0,
+               'created_at': now - timedelta(days=rng.randint(0, 365))}
+        row.update(extra)
+        user_id += 1
+        return row
+
+    student_rows = [make_user('student', student_class=rng.choice(CLASS_LEVELS)) for _ in range(students)]
+    teacher_rows = [make_user('teacher', subject_id=rng.choice(subjects)['id'],
+                              specialization=rng.choice(SPECIALIZATIONS)) for _ in range(teachers)]
+    tutor_rows = [make_user('tutor', specialization=rng.choice(SPECIALIZATIONS),
+                            hourly_rate=rng.choice([10, 15, 20, 25, 30])) for _ in range(tutors)]
+
+    # التقييمات تولد قبل إدراج المدرسين حتى تحسب تجميعاتهم مباشرة
+    rating_id = _next_id(Rating)
+    ratings = []
+    if student_rows:
+        for tutor in tutor_rows + teacher_rows:
+            for _ in range(rng.randint(0, ratings_per_tutor * 2)):
+                value = rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 4, 8, 10])[0]
+                ratings.append({'id': rating_id, 'teacher_id': tutor['id'],
+                                'student_id': rng.choice(student_rows)['id'], 'rating': value,
+                                'comment': rng.choice(COMMENTS),
+                                'created_at': now - timedelta(minutes=rng.randint(0, 200000))})
+                rating_id += 1
+                tutor['rating_sum'] += value
+                tutor['rating_count'] += 1
+            if tutor['rating_count']:
+                tutor['rating'] = tutor['rating_sum'] / tutor['rating_count']
+
+    _bulk_insert(User, student_rows + teacher_rows + tutor_rows)
+    _bulk_insert(Rating, ratings)
+    counts.update(students=len(student_rows), teachers=len(teacher_rows), tutors=len(tutor_rows),
+                  ratings=len(ratings))
+
+    # مقرر لكل مادة، ومحاضرات وواجبات موزعة على شهر قبل اليوم وبعده
+    course_id = _next_id(Course)
+    courses_by_level = {level: [] for level in CLASS_LEVELS}
+    courses = []
+    for subject in subjects:
+        courses.append({'id': course_id, 'name': subject['name'], 'class_level': subject['class_level'],
+                        'created_at': now})
+        courses_by_level[subject['class_level']].append(course_id)
+        course_id += 1
+    _bulk_insert(Course, courses)
+
+    lecture_id = _next_id(Lecture)
+    lectures = []
+    assignment_id = _next_id(Assignment)
+    assignments_by_course = {}
+    assignments = []
+    for course in courses:
+        for i in range(lectures_per_course):
+            start = now + timedelta(hours=rng.randint(-24 * 30, 24 * 30))
+            lectures.append({'id': lecture_id, 'course_id': course['id'], 'title': f'المحاضرة {i + 1}',
+                             'start_time': start, 'end_time': start + timedelta(hours=1), 'created_at': now})
+            lecture_id += 1
+        ids = []
+        for i in range(assignments_per_course):
+            assignments.append({'id': assignment_id, 'course_id': course['id'], 'title': f'الواجب {i + 1}',
+                                'due_date': now + timedelta(days=rng.randint(-30, 30)), 'created_at': now})
+            ids.append(assignment_id)
+            assignment_id += 1
+        assignments_by_course[course['id']] = ids
+    _bulk_insert(Lecture, lectures)
+    _bulk_insert(Assignment, assignments)
+    counts.update(courses=len(courses), lectures=len(lectures), assignments=len(assignments))
+
+    enrollment_id = _next_id(Enrollment)
+    submission_id = _next_id(AssignmentSubmission)
+    enrollments = []
+    submissions = []
+    for student in student_rows:
+        level_courses = courses_by_level[student['student_class']]
+        chosen = rng.sample(level_courses, min(courses_per_student, len(level_courses)))
+        for cid in chosen:
+            enrollments.append({'id': enrollment_id, 'student_id': student['id'], 'course_id': cid,
+                                'enrollment_date': now - timedelta(days=rng.randint(0, 120))})
+            enrollment_id += 1
+        for _ in range(submissions_per_student):
+            cid = rng.choice(chosen)
+            submissions.append({'id': submission_id, 'student_id': student['id'],
+                                'assignment_id': rng.choice(assignments_by_course[cid]),
+                                'status': rng.choice(['submitted', 'completed', 'completed']),
+                                'submission_date': now - timedelta(days=rng.randint(0, 60))})
+            submission_id += 1
+    _bulk_insert(Enrollment, enrollments)
+    _bulk_insert(AssignmentSubmission, submissions)
+    counts.update(enrollments=len(enrollments), submissions=len(submissions))
+
+    _sync_sequences([Subject, TeacherCode, User, Rating, Course, Lecture, Assignment, Enrollment,
+                     AssignmentSubmission])
+    db.session.commit()
+    return counts
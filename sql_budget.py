@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+# عدّ الاستعلامات المنفذة داخل كتلة with (للاختبارات والقياس)
+@contextmanager
+def count_queries(engine=Engine):
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+def _count_request_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statements = g.get('sql_statements', 0) + 1
+
+
+# حد أقصى لعدد الاستعلامات لكل صفحة: SQL_QUERY_BUDGETS = {'owner_panel': 10, ...}
+# عند تجاوزه يفشل الطلب في وضع الاختبار، ويسجل تحذير في غيره
+def init_app(app):
+    app.config.setdefault('SQL_QUERY_BUDGETS', {})
+    if not event.contains(Engine, 'before_cursor_execute', _count_request_query):
+        event.listen(Engine, 'before_cursor_execute', _count_request_query)
+
+    @app.after_request
+    def check_query_budget(response):
+        budget = app.config['SQL_QUERY_BUDGETS'].get(request.endpoint)
+        used = g.get('sql_statements', 0)
+        if budget is not None and used > budget:
+            message = f'{request.endpoint} ran {used} SQL statements (budget {budget})'
+            if app.testing:
+                raise QueryBudgetExceeded(message)
+            app.logger.warning(message)
+        return response
@@ -0,0 +1,242 @@
+import re
+import unicodedata
+from sqlalchemy import DDL, and_, column, delete, event, func, insert, inspect, literal, literal_column, or_, \
+    select, table, text
+from sqlalchemy.orm import joinedload
+from models import db, User, Subject, StaffSearch
+
+STAFF_TYPES = ('teacher', 'tutor')
+DEFAULT_LIMIT = 20
+BATCH_SIZE = 5000
+# أقصر كلمة يبحث لها عن أخطاء إملائية، وأقصى عدد من البدائل لكل كلمة
+FUZZY_MIN_LENGTH = 3
+FUZZY_MAX_TERMS = 20
+
+# الحركات والتطويل تحذف، والحروف المتشابهة في الكتابة توحد
+_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه', 'ى': 'ي', 'ؤ': 'و', 'ئ': 'ي',
+    'ی': 'ي', 'ک': 'ك',
+})
+_WORD = re.compile(r'\w+')
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKC', value or '')
+    return ' '.join(_WORD.findall(_DIACRITICS.sub('', value).translate(_LETTERS).lower()))
+
+
+def _tokens(value):
+    return normalize(value).split()
+
+
+def document(*fields):
+    # كل كلمة تفهرس كما هي، ومعها نسخة بدون "ال" حتى يطابق "الجبوري" البحث عن "جبوري"
+    words = []
+    for token in _tokens(' '.join(field or '' for field in fields)):
+        words.append(token)
+        if token.startswith('ال') and len(token) > 3:
+            words.append(token[2:])
+    return ' '.join(dict.fromkeys(words))
+
+
+# SQLite: جدول FTS5 بمحتوى خارجي يقرأ من staff_search، وتبقيه المشغلات متزامناً
+FTS_TABLE = 'staff_search_fts'
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"document, content='staff_search', content_rowid='user_id', tokenize='unicode61', prefix='2 3')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}_vocab USING fts5vocab({FTS_TABLE}, 'row')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON staff_search BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.user_id, new.document); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON staff_search BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.user_id, old.document); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON staff_search BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.user_id, old.document); "
+    f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.user_id, new.document); END",
+]
+SQLITE_DROP = [f'DROP TABLE IF EXISTS {FTS_TABLE}_vocab', f'DROP TABLE IF EXISTS {FTS_TABLE}']
+
+# الجداول المنشأة بـ db.create_all (التطوير والاختبار)؛ في قواعد الإنتاج تنشئها الترحيلات
+for statement in SQLITE_DDL:
+    event.listen(StaffSearch.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in SQLITE_DROP:
+    event.listen(StaffSearch.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(StaffSearch.__table__, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
+
+
+def include_name(name, type_, parent_names):
+    # جداول FTS5 وجداولها الداخلية لا تقابل نماذج، فتستثنى من مقارنة الترحيلات
+    return not (type_ == 'table' and name.startswith(FTS_TABLE))
+
+
+def include_object(object_, name, type_, reflected, compare_to):
+    # فهارس GIN خاصة بـ PostgreSQL ولا تنشأ في SQLite، فلا تعد ناقصة هناك
+    from alembic import context
+    dialect = object_.info.get('dialect') if type_ == 'index' else None
+    return dialect is None or dialect == context.get_bind().dialect.name
+
+
+STAFF_COLUMNS = (User.id, User.user_type, User.subject_id, User.first_name, User.last_name, User.specialization)
+
+
+def _row(connection, user):
+    subject = None
+    if user.subject_id:
+        subject = connection.execute(
+            select(Subject.name, Subject.class_level).where(Subject.id == user.subject_id)
+        ).first()
+    return {
+        'user_id': user.id,
+        'user_type': user.user_type,
+        'subject_id': user.subject_id,
+        'class_level': subject.class_level if subject else None,
+        'document': document(user.first_name, user.last_name, user.specialization,
+                             subject.name if subject else None),
+    }
+
+
+def _reindex(connection, user):
+    connection.execute(delete(StaffSearch).where(StaffSearch.user_id == user.id))
+    if user.user_type in STAFF_TYPES:
+        connection.execute(insert(StaffSearch).values(_row(connection, user)))
+
+
+# تحديث الفهرس داخل عملية الحفظ نفسها، فيلتزم أو يلغى مع تعديل المستخدم
+@event.listens_for(User, 'after_insert')
+def _user_added(mapper, connection, target):
+    if target.user_type in STAFF_TYPES:
+        connection.execute(insert(StaffSearch).values(_row(connection, target)))
+
+
+@event.listens_for(User, 'after_update')
+def _user_changed(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes()
+           for name in ('first_name', 'last_name', 'specialization', 'subject_id', 'user_type')):
+        _reindex(connection, target)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_removed(mapper, connection, target):
+    connection.execute(delete(StaffSearch).where(StaffSearch.user_id == target.id))
+
+
+@event.listens_for(Subject, 'after_update')
+def _subject_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.name.history.has_changes() or state.attrs.class_level.history.has_changes():
+        for user in connection.execute(select(*STAFF_COLUMNS).where(User.subject_id == target.id)):
+            _reindex(connection, user)
+
+
+def rebuild():
+    # إعادة بناء الفهرس كاملاً (بعد الإدراج المباشر مثل seed، أو عند تغيير قواعد التطبيع)
+    rows = db.session.execute(
+        select(*STAFF_COLUMNS, Subject.name, Subject.class_level)
+        .outerjoin(Subject, Subject.id == User.subject_id)
+        .where(User.user_type.in_(STAFF_TYPES))
+    ).all()
+    values = [{'user_id': user_id, 'user_type': user_type, 'subject_id': subject_id, 'class_level': class_level,
+               'document': document(first_name, last_name, specialization, subject_name)}
+              for user_id, user_type, subject_id, first_name, last_name, specialization, subject_name, class_level
+              in rows]
+    db.session.execute(delete(StaffSearch))
+    for start in range(0, len(values), BATCH_SIZE):
+        db.session.execute(insert(StaffSearch), values[start:start + BATCH_SIZE])
+    db.session.commit()
+    return len(values)
+
+
+def _distance(a, b, limit):
+    # مسافة Levenshtein مع توقف مبكر إذا تجاوزت الحد
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _similar_terms(token):
+    # كلمات الفهرس القريبة إملائياً من كلمة البحث (أو من بدايتها، لأن البحث بالبادئة) كتعابير MATCH.
+    # المرشحون يحددون في SQLite لا في Python: الحرف الأول نفسه (نطاق على term يستخدم ترتيب
+    # الجدول) وطول ضمن الحد، وبدايات الكلمات الطويلة تجمع بطول كلمة البحث وتطابق كبادئة
+    size = len(token)
+    limit = 1 if size < 6 else 2
+    bounds = {'first': token[0], 'after': chr(ord(token[0]) + 1), 'size': size}
+    stems = db.session.execute(
+        text(f'SELECT DISTINCT substr(term, 1, :size) FROM {FTS_TABLE}_vocab '
+             'WHERE term >= :first AND term < :after AND length(term) >= :size'),
+        bounds
+    ).scalars()
+    similar = [stem for stem in stems if _distance(token, stem, limit) <= limit]
+    expressions = [f'"{stem}"*' for stem in similar]
+    terms = db.session.execute(
+        text(f'SELECT term FROM {FTS_TABLE}_vocab WHERE term >= :first AND term < :after '
+             'AND length(term) BETWEEN :shortest AND :longest'),
+        dict(bounds, shortest=size - limit, longest=size + limit)
+    ).scalars()
+    expressions += [f'"{term}"' for term in terms
+                    if term[:size] not in similar and _distance(token, term, limit) <= limit]
+    return expressions[:FUZZY_MAX_TERMS]
+
+
+def _sqlite_match(tokens, fuzzy):
+    groups = []
+    for token in tokens:
+        terms = [f'"{token}"*']
+        if fuzzy and len(token) >= FUZZY_MIN_LENGTH:
+            terms += _similar_terms(token)
+        groups.append('(' + ' OR '.join(terms) + ')')
+    return ' AND '.join(groups)
+
+
+def _match(statement, tokens, fuzzy):
+    # يضيف شرط البحث النصي وترتيب النتائج حسب الصلة بحسب قاعدة البيانات
+    if db.engine.dialect.name == 'postgresql':
+        if fuzzy:
+            # pg_trgm: تشابه نص البحث مع أقرب جزء من المستند، ويستخدم فهرس GIN للثلاثيات
+            query = ' '.join(tokens)
+            return statement.where(literal(query).op('<%')(StaffSearch.document)) \
+                .order_by(func.word_similarity(query, StaffSearch.document).desc())
+        vector = func.to_tsvector(literal_column("'simple'"), StaffSearch.document)
+        tsquery = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{token}:*' for token in tokens))
+        return statement.where(vector.op('@@')(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+
+    fts = table(FTS_TABLE, column('rowid'), column('rank'))
+    return statement.join(fts, fts.c.rowid == StaffSearch.user_id) \
+        .where(literal_column(FTS_TABLE).op('MATCH')(_sqlite_match(tokens, fuzzy))) \
+        .order_by(fts.c.rank)
+
+
+def search(query='', user_type=None, subject_id=None, class_level=None, limit=DEFAULT_LIMIT):
+    # بحث بالبادئة أولاً، وإذا لم توجد نتائج يعاد البحث مع تحمل الأخطاء الإملائية
+    tokens = _tokens(query)
+    filters = []
+    if user_type:
+        filters.append(StaffSearch.user_type == user_type)
+    if subject_id:
+        filters.append(StaffSearch.subject_id == subject_id)
+    if class_level:
+        # المدرس الخصوصي يدرس كل الصفوف فيظهر تحت أي صف، أما مدرس المعهد بلا مادة فلا صف له
+        filters.append(or_(StaffSearch.class_level == class_level,
+                           and_(StaffSearch.class_level.is_(None), StaffSearch.user_type == 'tutor')))
+
+    def run(fuzzy):
+        statement = select(User).join(StaffSearch, StaffSearch.user_id == User.id) \
+            .options(joinedload(User.subject)).where(*filters)
+        if tokens:
+            statement = _match(statement, tokens, fuzzy)
+        return db.session.scalars(
+            statement.order_by(User.rating.desc(), User.first_name, User.id).limit(limit)
+        ).all()
+
+    results = run(fuzzy=False)
+    if not results and tokens:
+        results = run(fuzzy=True)
+    return results
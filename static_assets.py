@@ -0,0 +1,140 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli اختياري: بدونه نولد نسخ gzip فقط
+    brotli = None
+
+ONE_YEAR = 365 * 24 * 3600
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map'}
+MANIFEST_NAME = 'manifest.json'
+
+
+# بصمات ملفات static: الروابط تحمل ?v=<بصمة> فتخزن في المتصفح سنة كاملة،
+# وأي تعديل على الملف يغير الرابط تلقائياً
+class StaticManifest:
+    def __init__(self, app=None):
+        self.folder = None
+        self.hashes = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.folder = app.static_folder
+        self.hashes = self._load_manifest()
+        app.url_defaults(self._add_version)
+        app.view_functions['static'] = self.serve
+        app.extensions['static_manifest'] = self
+
+        @app.cli.command('build-static')
+        def build_static():
+            # يشغل أثناء البناء: حساب البصمات وتوليد النسخ المضغوطة مسبقاً
+            manifest = self.build()
+            print(f'Fingerprinted {len(manifest)} static files')
+
+    def _load_manifest(self):
+        path = os.path.join(self.folder, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {}
+
+    def _walk(self):
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                if name == MANIFEST_NAME or name.endswith(('.gz', '.br')):
+                    continue
+                full = os.path.join(root, name)
+                yield os.path.relpath(full, self.folder).replace(os.sep, '/'), full
+
+    def build(self):
+        manifest = {}
+        for filename, full in self._walk():
+            manifest[filename] = self._hash_file(full)
+            if os.path.splitext(filename)[1] in COMPRESSIBLE:
+                self._precompress(full)
+        with open(os.path.join(self.folder, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=0, sort_keys=True)
+        self.hashes = manifest
+        return manifest
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def _precompress(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        with gzip.open(path + '.gz', 'wb', compresslevel=9) as f:
+            f.write(data)
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+
+    def file_hash(self, filename):
+        # الملفات غير الموجودة في manifest (مثل الصور المرفوعة بعد التشغيل) تحسب عند أول طلب
+        # وتعاد عند تغير وقت التعديل أو الحجم
+        if filename in self.hashes:
+            return self.hashes[filename]
+        path = safe_join(self.folder, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._stats.get(filename)
+        if cached and cached[0] == key:
+            return cached[1]
+        value = self._hash_file(path)
+        with self._lock:
+            self._stats[filename] = (key, value)
+        return value
+
+    def _add_version(self, endpoint, values):
+        if endpoint == 'static' and 'v' not in values:
+            file_hash = self.file_hash(values.get('filename', ''))
+            if file_hash:
+                values['v'] = file_hash
+
+    def serve(self, filename):
+        path = safe_join(self.folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        file_hash = self.file_hash(filename)
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        # تقديم النسخة المضغوطة مسبقاً إن كان المتصفح يقبلها
+        encoding = None
+        accepted = request.headers.get('Accept-Encoding', '')
+        for candidate, ext in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in accepted and os.path.isfile(path + ext):
+                path, encoding = path + ext, candidate
+                break
+
+        response = send_file(path, mimetype=mimetype, conditional=False, etag=False)
+        response.set_etag(f'{file_hash}-{encoding}' if encoding else file_hash)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+
+        if request.args.get('v') == file_hash:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = ONE_YEAR
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
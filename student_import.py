@@ -0,0 +1,217 @@
+import csv
+import json
+import multiprocessing
+import os
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from sqlalchemy import insert, or_, select
+from werkzeug.datastructures import MultiDict
+from werkzeug.security import generate_password_hash
+from forms import RegistrationForm
+from models import db, User
+
+IMPORT_COLUMNS = ['first_name', 'last_name', 'email', 'username', 'password', 'student_class']
+REPORT_COLUMNS = ['line', 'email', 'username', 'errors']
+BATCH_SIZE = 1000
+
+
+def validate_row(row):
+    # نفس قواعد نموذج التسجيل، مع حساب طالب وتأكيد كلمة المرور نفسها
+    data = {name: (row.get(name) or '').strip() for name in IMPORT_COLUMNS}
+    data.update(user_type='student', confirm_password=data['password'])
+    form = RegistrationForm(formdata=MultiDict(data), meta={'csrf': False})
+    if form.validate():
+        return data, []
+    return data, [f'{name}: {message}' for name, messages in form.errors.items() for message in messages]
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_students(path, report_path, hash_workers=None, progress=None):
+    # قراءة الملف دفعة بعد دفعة: تحقق من الصفوف، كشف التكرار بمجموعات، تجزئة كلمات المرور
+    # على عدة عمليات، ثم إدراج الدفعة كاملة في معاملة واحدة
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        total = max(sum(1 for _ in f) - 1, 0)
+    summary = {'total': total, 'processed': 0, 'created': 0, 'failed': 0}
+    hash_workers = hash_workers or os.cpu_count()
+    seen_emails, seen_usernames = set(), set()
+
+    # spawn بدل fork لأن العملية الأم تعمل بعدة خيوط (gunicorn وعمال الخلفية)
+    context = multiprocessing.get_context('spawn')
+    with open(path, encoding='utf-8-sig', newline='') as source, \
+            open(report_path, 'w', encoding='utf-8-sig', newline='') as report_file, \
+            ProcessPoolExecutor(hash_workers, mp_context=context) as executor:
+        report = csv.writer(report_file)
+        report.writerow(REPORT_COLUMNS)
+        reader = csv.DictReader(source)
+        missing = set(IMPORT_COLUMNS) - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError('missing columns: ' + ', '.join(sorted(missing)))
+
+        for batch in _batches(enumerate(reader, start=2), BATCH_SIZE):
+            rows, errors = [], {}
+            for line, row in batch:
+                data, row_errors = validate_row(row)
+                if data['email'] in seen_emails:
+                    row_errors.append('email: مكرر في الملف')
+                if data['username'] in seen_usernames:
+                    row_errors.append('username: مكرر في الملف')
+                seen_emails.add(data['email'])
+                seen_usernames.add(data['username'])
+                if row_errors:
+                    errors[line] = (data, row_errors)
+                else:
+                    rows.append((line, data))
+
+            if rows:
+                taken = db.session.execute(
+                    select(User.email, User.username).where(or_(
+                        User.email.in_([data['email'] for _, data in rows]),
+                        User.username.in_([data['username'] for _, data in rows])
+                    ))
+                ).all()
+                taken_emails = {email for email, _ in taken}
+                taken_usernames = {username for _, username in taken}
+                fresh = []
+                for line, data in rows:
+                    row_errors = []
+                    if data['email'] in taken_emails:
+                        row_errors.append('email: البريد الإلكتروني موجود مسبقاً')
+                    if data['username'] in taken_usernames:
+                        row_errors.append('username: اسم المستخدم موجود مسبقاً')
+                    if row_errors:
+                        errors[line] = (data, row_errors)
+                    else:
+                        fresh.append(data)
+                rows = fresh
+
+            if rows:
+                chunksize = max(len(rows) // (hash_workers * 4), 1)
+                hashes = executor.map(generate_password_hash, [data['password'] for data in rows],
+                                      chunksize=chunksize)
+                now = datetime.now(timezone.utc)
+                db.session.execute(insert(User), [{
+                    'first_name': data['first_name'],
+                    'last_name': data['last_name'],
+                    'email': data['email'],
+                    'username': data['username'],
+                    'password_hash': password_hash,
+                    'user_type': 'student',
+                    'student_class': data['student_class'],
+                    'created_at': now,
+                } for data, password_hash in zip(rows, hashes)])
+                db.session.commit()
+
+            for line in sorted(errors):
+                data, row_errors = errors[line]
+                report.writerow([line, data['email'], data['username'], '; '.join(row_errors)])
+            summary['processed'] += len(batch)
+            summary['created'] += len(rows)
+            summary['failed'] += len(errors)
+            if progress:
+                progress(dict(summary))
+    return summary
+
+
+# استيراد الطلاب في الخلفية: الطلب يحفظ الملف ويعود برقم مهمة، وحالة المهمة تكتب
+# في ملف JSON بجانب تقرير الأخطاء في IMPORT_FOLDER، فيقرؤها أي عامل gunicorn على الخادم
+# سواء كان Redis مضبوطاً أم لا
+class StudentImport:
+    def __init__(self, app=None):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self.app = None
+        self.folder = None
+        self.hash_workers = None
+        self.retention = 24 * 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMPORT_FOLDER', os.path.join(tempfile.gettempdir(), 'academy-imports'))
+        app.config.setdefault('IMPORT_HASH_WORKERS', int(os.environ.get('IMPORT_HASH_WORKERS', 0)) or None)
+        # ملفات المهام (الحالة وتقرير الأخطاء) تحذف بعد هذه المدة
+        app.config.setdefault('IMPORT_RETENTION', 24 * 3600)
+        self.app = app
+        self.retention = app.config['IMPORT_RETENTION']
+        self.folder = app.config['IMPORT_FOLDER']
+        self.hash_workers = app.config['IMPORT_HASH_WORKERS']
+        os.makedirs(self.folder, exist_ok=True)
+        app.extensions['student_import'] = self
+
+    def _pool(self):
+        # مهمة استيراد واحدة في كل عامل، والتوازي داخلها في تجزئة كلمات المرور
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(1, thread_name_prefix='student-import')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def paths(self, job_id):
+        return os.path.join(self.folder, f'{job_id}.csv'), os.path.join(self.folder, f'{job_id}-errors.csv')
+
+    def _status_path(self, job_id):
+        return os.path.join(self.folder, f'{job_id}-status.json')
+
+    def _purge_old(self):
+        cutoff = time.time() - self.retention
+        for entry in os.scandir(self.folder):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def start(self, file, on_complete=None):
+        self._purge_old()
+        job_id = secrets.token_hex(8)
+        path, _ = self.paths(job_id)
+        file.save(path)
+        self._set_status(job_id, {'state': 'queued', 'total': 0, 'processed': 0, 'created': 0, 'failed': 0})
+        self._pool().submit(self._run, job_id, on_complete)
+        return job_id
+
+    def status(self, job_id):
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._status_path(job_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _set_status(self, job_id, status):
+        # كتابة ملف مؤقت ثم استبداله، فلا يقرأ عامل آخر ملفاً نصف مكتوب
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self._status_path(job_id))
+
+    def _run(self, job_id, on_complete):
+        path, report_path = self.paths(job_id)
+        with self.app.app_context():
+            try:
+                summary = import_students(
+                    path, report_path, self.hash_workers,
+                    progress=lambda s: self._set_status(job_id, dict(s, state='running'))
+                )
+                self._set_status(job_id, dict(summary, state='done'))
+                if on_complete:
+                    on_complete()
+            except Exception as e:
+                db.session.rollback()
+                status = self.status(job_id) or {}
+                self._set_status(job_id, dict(status, state='failed', error=str(e)))
+            finally:
+                os.remove(path)
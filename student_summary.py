@@ -0,0 +1,199 @@
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, User, StudentSummary, Enrollment, AssignmentSubmission, Lecture
+
+UPCOMING_DAYS = 7
+# بعد هذه المدة يعاد حساب عداد المحاضرات القادمة عند القراءة، حتى لو لم يشغل الحساب الدوري
+MAX_AGE = timedelta(seconds=int(os.environ.get('STUDENT_SUMMARY_MAX_AGE', 3600)))
+BATCH_SIZE = 5000
+
+summary = StudentSummary.__table__
+
+
+def _window():
+    now = datetime.now(timezone.utc)
+    return now, now + timedelta(days=UPCOMING_DAYS)
+
+
+def _aware(value):
+    # SQLite يعيد التواريخ بدون منطقة زمنية، وكل التواريخ في التطبيق مخزنة بتوقيت UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _in_window(start_time):
+    start, end = _window()
+    start_time = _aware(start_time)
+    return start_time is not None and start < start_time < end
+
+
+def _upcoming_in_course(course_id):
+    start, end = _window()
+    return select(func.count(Lecture.id)).where(
+        Lecture.course_id == course_id, Lecture.start_time > start, Lecture.start_time < end
+    ).scalar_subquery()
+
+
+def _students_in_course(course_id):
+    return select(Enrollment.student_id).where(Enrollment.course_id == course_id)
+
+
+def _adjust(connection, where, **deltas):
+    # الصفوف غير الموجودة لا تحدث هنا، وتحسب كاملة عند أول قراءة لها
+    connection.execute(update(summary).where(where).values(
+        {name: getattr(summary.c, name) + delta for name, delta in deltas.items()}
+    ))
+
+
+def _forget(connection, *student_ids):
+    # للتغييرات النادرة (نقل تسجيل أو تسليم بين طلاب): نحذف الملخص ليعاد حسابه
+    connection.execute(delete(summary).where(summary.c.student_id.in_(student_ids)))
+
+
+def _history(target, name):
+    history = inspect(target).attrs[name].history
+    old = history.deleted[0] if history.deleted else getattr(target, name)
+    return old, getattr(target, name), history.has_changes()
+
+
+# تحديث العدادات داخل عملية الحفظ نفسها (flush)، فتلتزم أو تلغى مع التغيير الأصلي
+@event.listens_for(Enrollment, 'after_insert')
+def _enrollment_added(mapper, connection, target):
+    _adjust(connection, summary.c.student_id == target.student_id,
+            enrolled_courses=1, upcoming_lectures=_upcoming_in_course(target.course_id))
+
+
+@event.listens_for(Enrollment, 'after_delete')
+def _enrollment_removed(mapper, connection, target):
+    _adjust(connection, summary.c.student_id == target.student_id,
+            enrolled_courses=-1, upcoming_lectures=-_upcoming_in_course(target.course_id))
+
+
+@event.listens_for(Enrollment, 'after_update')
+def _enrollment_changed(mapper, connection, target):
+    old_student, _, student_changed = _history(target, 'student_id')
+    _, _, course_changed = _history(target, 'course_id')
+    if student_changed or course_changed:
+        _forget(connection, old_student, target.student_id)
+
+
+@event.listens_for(AssignmentSubmission, 'after_insert')
+def _submission_added(mapper, connection, target):
+    if target.status == 'completed':
+        _adjust(connection, summary.c.student_id == target.student_id, completed_assignments=1)
+
+
+@event.listens_for(AssignmentSubmission, 'after_delete')
+def _submission_removed(mapper, connection, target):
+    if target.status == 'completed':
+        _adjust(connection, summary.c.student_id == target.student_id, completed_assignments=-1)
+
+
+@event.listens_for(AssignmentSubmission, 'after_update')
+def _submission_changed(mapper, connection, target):
+    old_student, _, student_changed = _history(target, 'student_id')
+    old_status, status, _ = _history(target, 'status')
+    if student_changed:
+        _forget(connection, old_student, target.student_id)
+    elif (old_status == 'completed') != (status == 'completed'):
+        _adjust(connection, summary.c.student_id == target.student_id,
+                completed_assignments=1 if status == 'completed' else -1)
+
+
+@event.listens_for(Lecture, 'after_insert')
+def _lecture_added(mapper, connection, target):
+    if _in_window(target.start_time):
+        _adjust(connection, summary.c.student_id.in_(_students_in_course(target.course_id)), upcoming_lectures=1)
+
+
+@event.listens_for(Lecture, 'after_delete')
+def _lecture_removed(mapper, connection, target):
+    if _in_window(target.start_time):
+        _adjust(connection, summary.c.student_id.in_(_students_in_course(target.course_id)), upcoming_lectures=-1)
+
+
+@event.listens_for(Lecture, 'after_update')
+def _lecture_changed(mapper, connection, target):
+    old_start, start, _ = _history(target, 'start_time')
+    old_course, course, _ = _history(target, 'course_id')
+    was, now = _in_window(old_start), _in_window(start)
+    if was and (old_course != course or not now):
+        _adjust(connection, summary.c.student_id.in_(_students_in_course(old_course)), upcoming_lectures=-1)
+    if now and (old_course != course or not was):
+        _adjust(connection, summary.c.student_id.in_(_students_in_course(course)), upcoming_lectures=1)
+
+
+def _counts():
+    # ثلاثة استعلامات GROUP BY تحسب عدادات كل الطلاب
+    start, end = _window()
+    enrolled = db.session.execute(
+        select(Enrollment.student_id, func.count(Enrollment.id))
+        .group_by(Enrollment.student_id)
+    ).all()
+    completed = db.session.execute(
+        select(AssignmentSubmission.student_id, func.count(AssignmentSubmission.id))
+        .where(AssignmentSubmission.status == 'completed')
+        .group_by(AssignmentSubmission.student_id)
+    ).all()
+    upcoming = db.session.execute(
+        select(Enrollment.student_id, func.count(Lecture.id))
+        .join(Lecture, Lecture.course_id == Enrollment.course_id)
+        .where(Lecture.start_time > start, Lecture.start_time < end)
+        .group_by(Enrollment.student_id)
+    ).all()
+    rows = {}
+    for name, counts in (('enrolled_courses', enrolled), ('completed_assignments', completed),
+                         ('upcoming_lectures', upcoming)):
+        for student_id, count in counts:
+            rows.setdefault(student_id, {'student_id': student_id})[name] = count
+    return rows
+
+
+def refresh(student_id):
+    # العدادات الثلاثة لطالب واحد باستعلام واحد
+    start, end = _window()
+    enrolled, completed, upcoming = db.session.execute(select(
+        select(func.count(Enrollment.id)).where(Enrollment.student_id == student_id).scalar_subquery(),
+        select(func.count(AssignmentSubmission.id)).where(
+            AssignmentSubmission.student_id == student_id, AssignmentSubmission.status == 'completed'
+        ).scalar_subquery(),
+        select(func.count(Lecture.id)).join(Enrollment, Lecture.course_id == Enrollment.course_id).where(
+            Enrollment.student_id == student_id, Lecture.start_time > start, Lecture.start_time < end
+        ).scalar_subquery()
+    )).one()
+    values = {'student_id': student_id, 'enrolled_courses': enrolled, 'completed_assignments': completed,
+              'upcoming_lectures': upcoming, 'refreshed_at': datetime.now(timezone.utc)}
+    # الكتابة في معاملة مستقلة حتى لا ينهي commit كائنات الجلسة (مثل current_user)
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(delete(summary).where(summary.c.student_id == student_id))
+            connection.execute(insert(summary).values(values))
+    except IntegrityError:
+        # طلب آخر للطالب نفسه أعاد الحساب في الوقت نفسه
+        pass
+    return StudentSummary(**values)
+
+
+def get(student_id):
+    # قراءة واحدة بالمفتاح الأساسي؛ الحساب الكامل فقط إذا لم يوجد الملخص أو تجاوز عمره MAX_AGE
+    row = db.session.get(StudentSummary, student_id)
+    if row is None or _aware(row.refreshed_at) < datetime.now(timezone.utc) - MAX_AGE:
+        row = refresh(student_id)
+    return row
+
+
+def rebuild():
+    # إعادة بناء كل الملخصات (تشغل دورياً لتحريك نافذة المحاضرات القادمة)
+    rows = _counts()
+    now = datetime.now(timezone.utc)
+    values = [{'student_id': student_id, 'enrolled_courses': 0, 'completed_assignments': 0,
+               'upcoming_lectures': 0, **rows.get(student_id, {}), 'refreshed_at': now}
+              for student_id in db.session.scalars(select(User.id).filter_by(user_type='student'))]
+    db.session.execute(delete(summary))
+    for start in range(0, len(values), BATCH_SIZE):
+        db.session.execute(insert(summary), values[start:start + BATCH_SIZE])
+    db.session.commit()
+    return len(values)
@@ -0,0 +1,148 @@
+import csv
+import io
+import secrets
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from models import db, Subject, TeacherCode
+
+MAX_CODES_PER_BATCH = 5000
+CHUNK_SIZE = 1000
+EXPORT_HEADER = ['code', 'subject', 'class_level', 'status', 'created_at']
+
+
+def new_code():
+    return secrets.token_hex(3).upper()
+
+
+def _existing_codes(candidates):
+    # فحص التكرار بمجموعة واحدة لكل دفعة بدل استعلام لكل كود
+    candidates = list(candidates)
+    existing = set()
+    for start in range(0, len(candidates), CHUNK_SIZE):
+        chunk = candidates[start:start + CHUNK_SIZE]
+        existing.update(db.session.scalars(select(TeacherCode.code).where(TeacherCode.code.in_(chunk))))
+    return existing
+
+
+def _unique_codes(count):
+    codes = set()
+    while len(codes) < count:
+        batch = {new_code() for _ in range(count - len(codes))} - codes
+        codes |= batch - _existing_codes(batch)
+    return list(codes)
+
+
+# توليد عدد من الأكواد لكل مادة في معاملة واحدة وإدراجها دفعة واحدة
+def generate_codes(subject_ids, per_subject, attempts=3):
+    total = len(subject_ids) * per_subject
+    if total > MAX_CODES_PER_BATCH:
+        raise ValueError(f'at most {MAX_CODES_PER_BATCH} codes per batch')
+    for attempt in range(attempts):
+        codes = iter(_unique_codes(total))
+        now = datetime.now(timezone.utc)
+        rows = [{'code': next(codes), 'subject_id': subject_id, 'used': False, 'created_at': now}
+                for subject_id in subject_ids for _ in range(per_subject)]
+        try:
+            for start in range(0, len(rows), CHUNK_SIZE):
+                db.session.execute(insert(TeacherCode), rows[start:start + CHUNK_SIZE])
+            db.session.commit()
+            return rows
+        except IntegrityError:
+            # طلب آخر أدرج الكود نفسه بين الفحص والإدراج: نعيد المحاولة بأكواد جديدة
+            db.session.rollback()
+            if attempt == attempts - 1:
+                raise
+
+
+def export_rows(subject_id=None, unused_only=False):
+    query = (
+        select(TeacherCode.code, Subject.name, Subject.class_level, TeacherCode.used, TeacherCode.created_at)
+        .join(Subject, TeacherCode.subject_id == Subject.id)
+        .order_by(Subject.class_level, Subject.name, TeacherCode.created_at, TeacherCode.id)
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    if subject_id:
+        query = query.where(TeacherCode.subject_id == subject_id)
+    if unused_only:
+        query = query.where(TeacherCode.used.is_(False))
+    for code, subject, class_level, used, created_at in db.session.execute(query):
+        yield [code, subject, class_level, 'used' if used else 'available',
+               created_at.strftime('%Y-%m-%d %H:%M') if created_at else '']
+
+
+def csv_stream(rows):
+    # يكتب الملف صفاً بصف أثناء الإرسال دون بنائه كاملاً في الذاكرة
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # علامة BOM حتى يفتح Excel النصوص العربية بترميز UTF-8
+    yield '\ufeff'
+    for row in _with_header(rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _with_header(rows):
+    yield EXPORT_HEADER
+    yield from rows
+
+
+def _xlsx_cell(ref, value):
+    return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+# ملف XLSX بسيط (ورقة واحدة بخلايا نصية) يكتب إلى ملف مؤقت دون الحاجة إلى openpyxl
+def xlsx_file(rows):
+    output = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'))
+        archive.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="xl/workbook.xml" Type="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'))
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="codes" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml" Type="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships/worksheet"/>'
+            '</Relationships>'))
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                        b'<sheetData>')
+            for r, row in enumerate(_with_header(rows), start=1):
+                cells = ''.join(_xlsx_cell(f'{_column_letter(c)}{r}', value) for c, value in enumerate(row))
+                sheet.write(f'<row r="{r}">{cells}</row>'.encode())
+            sheet.write(b'</sheetData></worksheet>')
+    output.seek(0)
+    return output
@@ -0,0 +1,29 @@
+# تطبيق اختبار بقاعدة SQLite مؤقتة منشأة بـ db.create_all، بدون Redis
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from app import create_app
+    from extensions import cache
+    from models import db
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'test.db'),
+        'TEMPLATE_BYTECODE_DIR': str(tmp_path / 'jinja_cache'),
+    })
+    with app.app_context():
+        db.create_all()
+    cache.local.clear()
+    # بدون سياق تطبيق مفتوح: كل طلب في test_client يبدأ سياقه الخاص (و g الخاص به)
+    # كما في الخادم، فلا تتراكم عدادات الاستعلامات بين الطلبات
+    return app
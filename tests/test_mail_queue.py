@@ -0,0 +1,139 @@
+# صندوق البريد الصادر مع خادم SMTP محلي (aiosmtpd) بدل خادم البريد الحقيقي
+#
+#   python -m pytest tests/test_mail_queue.py
+import os
+import socket
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+from app import create_app
+from extensions import mail_queue
+from models import db, MailOutbox
+
+
+class Inbox:
+    # يرفض أول fail_first رسائل برد مؤقت (451) ثم يقبل الباقي
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.fail_first:
+            self.fail_first -= 1
+            return '451 try again later'
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode()))
+        return '250 OK'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    started = []
+
+    def start(inbox, port=None):
+        controller = aiosmtpd_controller.Controller(inbox, hostname='127.0.0.1', port=port or free_port())
+        controller.start()
+        started.append(controller)
+        return controller.port
+    yield start
+    for controller in started:
+        controller.stop()
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def make(port):
+        app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'mail.db'),
+            'TEMPLATE_BYTECODE_DIR': str(tmp_path / 'jinja_cache'),
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': port,
+            'MAIL_USE_TLS': False,
+            'MAIL_USERNAME': None,
+            'MAIL_DEFAULT_SENDER': 'academy@example.com',
+            'MAIL_RETRY_BACKOFF': 0.1,
+            'MAIL_POLL_INTERVAL': 0.1,
+        })
+        with app.app_context():
+            db.create_all()
+        return app
+    return make
+
+
+def test_send_returns_before_delivery_and_worker_sends(smtp, make_app):
+    inbox = Inbox()
+    app = make_app(smtp(inbox))
+    with app.app_context():
+        mail_queue.send('student@example.com', 'reset', 'code: 12345')
+        db.session.commit()
+    assert mail_queue.join(timeout=10)
+    assert len(inbox.messages) == 1
+    rcpt, content = inbox.messages[0]
+    assert rcpt == ['student@example.com']
+    assert 'code: 12345' in content
+
+
+def test_temporary_failure_is_retried_from_the_outbox(smtp, make_app):
+    inbox = Inbox(fail_first=2)
+    app = make_app(smtp(inbox))
+    with app.app_context():
+        mail_queue.send('student@example.com', 'reset', 'code: 12345')
+        db.session.commit()
+    assert mail_queue.join(timeout=10)
+    assert len(inbox.messages) == 1
+
+
+def test_unreachable_server_keeps_message_in_outbox(make_app):
+    # لا خادم على المنفذ: الرسالة تبقى في الجدول مؤجلة لإعادة المحاولة
+    app = make_app(free_port())
+    app.config['MAIL_RETRY_BACKOFF'] = 60
+    with app.app_context():
+        mail_queue.send('student@example.com', 'reset', 'code: 12345')
+        db.session.commit()
+    assert not mail_queue.join(timeout=1)
+    with app.app_context():
+        row = db.session.scalars(db.select(MailOutbox)).one()
+        assert row.attempts >= 1
+
+
+def test_message_left_by_a_stopped_worker_is_sent(smtp, make_app):
+    # رسالة حجزها عامل توقف قبل إرسالها تعود مستحقة ويرسلها عامل آخر
+    inbox = Inbox()
+    app = make_app(smtp(inbox))
+    with app.app_context():
+        db.session.add(MailOutbox(recipient='student@example.com', subject='reset', body='code: 12345',
+                                  attempts=1, next_attempt_at=datetime.now(timezone.utc)))
+        db.session.commit()
+    mail_queue.start()
+    assert mail_queue.join(timeout=10)
+    assert len(inbox.messages) == 1
+
+
+def test_send_leaves_the_commit_to_the_caller(smtp, make_app):
+    # الإرسال لا يحفظ تغييرات الطلب المعلقة، والتراجع عن المعاملة يلغي الرسالة معها
+    inbox = Inbox()
+    app = make_app(smtp(inbox))
+    with app.app_context():
+        db.session.add(MailOutbox(recipient='other@example.com', subject='pending', body='not committed',
+                                  attempts=0, next_attempt_at=datetime.now(timezone.utc)))
+        mail_queue.send('student@example.com', 'reset', 'code: 12345')
+        db.session.rollback()
+        assert mail_queue.pending() == 0
+    mail_queue.start()
+    assert mail_queue.join(timeout=1)
+    assert inbox.messages == []
@@ -0,0 +1,73 @@
+# مؤشرات الصفحات (?after= و?before=) يعدلها المستخدم: المؤشر التالف يعامل كأنه غير موجود
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor
+from models import db, User, Course, Enrollment
+import queries
+
+
+def cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+BAD_CURSORS = ['WzFd', 'eyJhIjoxfQ', 'W1tdLFtdXQ', 'not-base64!', cursor('"x"'), cursor('[1, 2, 3]'),
+               cursor('["2026-01-01", 1]'), cursor('[{"dt": 5}, 1]'), cursor('[{"dt": "x"}, 1]'),
+               cursor('[{"dt": "2026-01-01T00:00:00", "x": 1}, 1]'), cursor('[{"dt": "2026-01-01T00:00:00"}, "1"]'),
+               cursor('[{"dt": "2026-01-01T00:00:00"}, true]')]
+
+
+def test_decode_cursor_round_trip():
+    created = datetime(2026, 1, 1, 8, 30)
+    assert decode_cursor(encode_cursor([created, 7]), (datetime, int)) == (created, 7)
+    assert decode_cursor(encode_cursor(['Ali', 3]), (str, int)) == ('Ali', 3)
+
+
+@pytest.mark.parametrize('bad', BAD_CURSORS)
+def test_decode_cursor_rejects_wrong_shape(bad):
+    assert decode_cursor(bad, (datetime, int)) is None
+
+
+@pytest.fixture
+def student(app):
+    with app.app_context():
+        return add_student()
+
+
+def add_student():
+    student = User(first_name='Sara', last_name='Ali', email='sara@example.com', username='sara',
+                   user_type='student', student_class='first_intermediate')
+    student.set_password('secret1')
+    db.session.add(student)
+    db.session.flush()
+    start = datetime.now(timezone.utc)
+    for n in range(3):
+        course = Course(name=f'Course {n}', class_level='first_intermediate')
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(Enrollment(student_id=student.id, course_id=course.id,
+                                  enrollment_date=start - timedelta(days=n)))
+    db.session.commit()
+    return student.id
+
+
+@pytest.mark.parametrize('bad', BAD_CURSORS)
+def test_tampered_cursor_returns_first_page(app, student, bad):
+    with app.app_context():
+        first = queries.student_enrollments(student, per_page=2)
+        for page in (queries.student_enrollments(student, after=bad, per_page=2),
+                     queries.student_enrollments(student, before=bad, per_page=2)):
+            assert [e.id for e in page] == [e.id for e in first]
+        assert len(queries.completed_submissions(student, after=bad)) == 0
+        assert len(queries.staff_page('teacher', after=bad)) == 0
+
+
+def test_tampered_cursor_in_request(app, student):
+    client = app.test_client()
+    assert client.post('/login', data={'identifier': 'sara', 'password': 'secret1'}).status_code == 302
+    for path in ('/student_courses', '/completed_assignments', '/upcoming_lectures'):
+        for bad in ('WzFd', 'eyJhIjoxfQ', 'W1tdLFtdXQ'):
+            assert client.get(f'{path}?after={bad}').status_code == 200
+            assert client.get(f'{path}?before={bad}').status_code == 200
@@ -0,0 +1,65 @@
+# عدد استعلامات SQL في صفحات المالك والطالب ثابت مهما زادت البيانات (SQL_QUERY_BUDGETS في app.py).
+# في وضع الاختبار يرفع sql_budget خطأ QueryBudgetExceeded عند التجاوز، فيفشل الطلب
+import pytest
+from sqlalchemy import select
+
+from extensions import cache, leaderboard
+from models import db, User, TimetableSlot
+from sql_budget import QueryBudgetExceeded
+import seed_data
+import staff_search
+import student_summary
+
+
+@pytest.fixture
+def seeded(app):
+    with app.app_context():
+        seed_data.seed(students=30, teachers=8, tutors=12, ratings_per_tutor=3, courses_per_student=3,
+                       lectures_per_course=3, assignments_per_course=3, submissions_per_student=3)
+        student_summary.rebuild()
+        staff_search.rebuild()
+        leaderboard.rebuild()
+        owner = User(first_name='Owner', last_name='Account', email='owner@example.com', username='owner',
+                     user_type='owner')
+        owner.set_password('password')
+        db.session.add(owner)
+        student = db.session.scalars(select(User).filter_by(user_type='student')).first()
+        teachers = db.session.scalars(select(User).filter_by(user_type='teacher')).all()
+        # جدول يوم كامل لصف الطالب حتى تعرض لوحته حصصاً بمدرسيها
+        for period, teacher in enumerate(teachers[:6], 1):
+            db.session.add(TimetableSlot(class_level=student.student_class, day='sunday', period=period,
+                                         subject_id=teacher.subject_id, teacher_id=teacher.id))
+        db.session.commit()
+        tutor = db.session.scalars(select(User).filter_by(user_type='tutor')
+                                   .order_by(User.rating_count.desc())).first()
+        return {'student': student.username, 'teacher': teachers[0].id, 'tutor': tutor.id}
+
+
+def client_for(app, username):
+    client = app.test_client()
+    assert client.post('/login', data={'identifier': username, 'password': 'password'}).status_code == 302
+    return client
+
+
+def get_cold_and_warm(client, path):
+    # أول طلب بذاكرة مؤقتة فارغة (أسوأ حالة) ثم طلب يقرأ منها
+    cache.local.clear()
+    assert client.get(path).status_code == 200
+    assert client.get(path).status_code == 200
+
+
+def test_owner_panel_within_budget(app, seeded):
+    get_cold_and_warm(client_for(app, 'owner'), '/owner')
+
+
+def test_student_pages_within_budget(app, seeded):
+    client = client_for(app, seeded['student'])
+    get_cold_and_warm(client, '/student_dashboard')
+    get_cold_and_warm(client, f"/teacher_profile/{seeded['teacher']}")
+    get_cold_and_warm(client, f"/teacher_profile/{seeded['tutor']}")
+
+
+def test_budget_is_enforced(app, seeded):
+    app.config['SQL_QUERY_BUDGETS'] = dict(app.config['SQL_QUERY_BUDGETS'], **{'student.student_dashboard': 1})
+    with pytest.raises(QueryBudgetExceeded):
+        client_for(app, seeded['student']).get('/student_dashboard')
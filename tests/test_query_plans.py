@@ -0,0 +1,16 @@
+# الاستعلامات المتكررة تستخدم فهارسها على مخطط db.create_all (مثل أمر check-indexes)
+import query_plans
+
+
+def test_hot_queries_use_an_index(app):
+    with app.app_context():
+        assert query_plans.check_hot_queries() == {}
+
+
+def test_full_scan_is_detected(app):
+    # التحقق نفسه يلتقط المسح الكامل، فلا ينجح الاختبار أعلاه لأن الفحص لا يرى شيئاً
+    from sqlalchemy import select
+    from models import User
+    with app.app_context():
+        plan = query_plans.explain(select(User).filter_by(bio='x'))
+        assert any(query_plans.is_full_scan(line) for line in plan)
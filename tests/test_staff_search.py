@@ -0,0 +1,24 @@
+# مرشح الصف في بحث المدرسين: مدرسو مادة الصف والمدرسون الخصوصيون فقط
+from models import db, User, Subject
+import staff_search
+
+
+def add_staff(username, user_type, subject=None):
+    user = User(first_name=username, last_name='Test', email=f'{username}@example.com', username=username,
+                password_hash='x', user_type=user_type, subject=subject)
+    db.session.add(user)
+    return user
+
+
+def test_class_filter_keeps_tutors_but_not_teachers_without_subject(app):
+    with app.app_context():
+        math = Subject(class_level='first_intermediate', name='Math', code='M1')
+        physics = Subject(class_level='sixth_science', name='Physics', code='P1')
+        add_staff('mathteacher', 'teacher', math)
+        add_staff('physicsteacher', 'teacher', physics)
+        add_staff('nosubject', 'teacher')
+        add_staff('tutor', 'tutor')
+        db.session.commit()
+
+        found = {user.username for user in staff_search.search(class_level='first_intermediate')}
+        assert found == {'mathteacher', 'tutor'}
@@ -0,0 +1,97 @@
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload
+from models import db, TimetableSlot
+
+DAYS = [
+    ('sunday', 'الأحد'),
+    ('monday', 'الاثنين'),
+    ('tuesday', 'الثلاثاء'),
+    ('wednesday', 'الأربعاء'),
+    ('thursday', 'الخميس')
+]
+PERIODS = range(1, 7)
+
+
+class DoubleBooking(ValueError):
+    def __init__(self, conflicts):
+        super().__init__('teacher double-booked')
+        # [(period, اسم المدرس, الصف المحجوز فيه)]
+        self.conflicts = conflicts
+
+
+def _teacher_name(teacher):
+    return f'{teacher.first_name} {teacher.last_name}' if teacher else None
+
+
+def _grid(slots, describe):
+    # شبكة أسبوعية جاهزة للعرض: صف لكل حصة وخلية لكل يوم
+    cells = {(slot.day, slot.period): describe(slot) for slot in slots}
+    return {
+        'days': DAYS,
+        'periods': [{'period': period, 'cells': [cells.get((day, period)) for day, _ in DAYS]}
+                    for period in PERIODS],
+        'empty': not cells,
+    }
+
+
+def class_grid(class_level):
+    slots = TimetableSlot.query.options(joinedload(TimetableSlot.subject), joinedload(TimetableSlot.teacher)) \
+        .filter_by(class_level=class_level).all()
+    return _grid(slots, lambda s: {'subject': s.subject.name, 'teacher': _teacher_name(s.teacher)})
+
+
+def teacher_grid(teacher_id):
+    slots = TimetableSlot.query.options(joinedload(TimetableSlot.subject)).filter_by(teacher_id=teacher_id).all()
+    return _grid(slots, lambda s: {'subject': s.subject.name, 'class_level': s.class_level})
+
+
+def unassign_teacher(teacher_id):
+    # يعيد الصفوف التي تغيرت جداولها
+    slots = TimetableSlot.query.filter_by(teacher_id=teacher_id).all()
+    for slot in slots:
+        slot.teacher_id = None
+    return {slot.class_level for slot in slots}
+
+
+def remove_subject(subject_id):
+    slots = TimetableSlot.query.filter_by(subject_id=subject_id).all()
+    for slot in slots:
+        db.session.delete(slot)
+    return {slot.class_level for slot in slots}, {slot.teacher_id for slot in slots if slot.teacher_id}
+
+
+# حفظ حصص يوم كامل لصف واحد بتحديث الصفوف الموجودة بدل إضافة نسخة جديدة
+# periods: {رقم الحصة: (subject_id, teacher_id)}، والحصة بدون مادة تحذف.
+# يعيد معرفات المدرسين الذين تغير جدولهم حتى تلغى شبكاتهم المخزنة
+def save_day(class_level, day, periods):
+    wanted = {period: value for period, value in periods.items() if value[0]}
+
+    # كشف تعارض المدرسين باستعلام واحد على فهرس (teacher_id, day, period)
+    booked = [(teacher_id, day, period) for period, (_, teacher_id) in wanted.items() if teacher_id]
+    if booked:
+        conflicts = TimetableSlot.query.options(joinedload(TimetableSlot.teacher)).filter(
+            tuple_(TimetableSlot.teacher_id, TimetableSlot.day, TimetableSlot.period).in_(booked),
+            TimetableSlot.class_level != class_level
+        ).all()
+        if conflicts:
+            raise DoubleBooking([(slot.period, _teacher_name(slot.teacher), slot.class_level)
+                                 for slot in sorted(conflicts, key=lambda slot: slot.period)])
+
+    existing = {slot.period: slot for slot in db.session.scalars(
+        select(TimetableSlot).filter_by(class_level=class_level, day=day))}
+    teachers = {slot.teacher_id for slot in existing.values()}
+
+    for period, slot in existing.items():
+        if period not in wanted:
+            db.session.delete(slot)
+    for period, (subject_id, teacher_id) in wanted.items():
+        slot = existing.get(period)
+        if slot is None:
+            slot = TimetableSlot(class_level=class_level, day=day, period=period)
+            db.session.add(slot)
+        slot.subject_id = subject_id
+        slot.teacher_id = teacher_id or None
+        teachers.add(teacher_id or None)
+    db.session.commit()
+    teachers.discard(None)
+    return teachers
@@ -0,0 +1,88 @@
+import os
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from models import db, User
+
+# يرفع عند تغيير أعمدة User حتى لا تقرأ نسخ مخزنة بالشكل القديم بعد النشر
+USER_CACHE_VERSION = 2
+# كلمة المرور المجزأة لا تخزن في الذاكرة المؤقتة، وتحمل من القاعدة عند الحاجة فقط
+EXCLUDED_COLUMNS = {'password_hash'}
+
+
+# تحميل المستخدم الحالي من الذاكرة المؤقتة بدل استعلام SELECT في كل طلب.
+# النسخة المخزنة تلغى تلقائياً بعد أي تعديل أو حذف للمستخدم عبر ORM. الإلغاء يصل إلى كل
+# العمال عبر Redis فقط، أما نسخة LRU فلا يحذفها إلا العامل الذي حفظ التعديل، لذلك تبقى فيها
+# ثوانيَ معدودة (USER_CACHE_LOCAL_TTL) حتى لا يبقى مستخدم محذوف أو مخفضة صلاحيته مقبولاً
+class UserCache:
+    def __init__(self, app=None, cache=None):
+        self.cache = None
+        self.ttl = 300
+        self.local_ttl = 5
+        if app is not None:
+            self.init_app(app, cache)
+
+    def init_app(self, app, cache):
+        app.config.setdefault('USER_CACHE_TTL', int(os.environ.get('USER_CACHE_TTL', 300)))
+        app.config.setdefault('USER_CACHE_LOCAL_TTL', int(os.environ.get('USER_CACHE_LOCAL_TTL', 5)))
+        self.cache = cache
+        self.ttl = app.config['USER_CACHE_TTL']
+        self.local_ttl = app.config['USER_CACHE_LOCAL_TTL']
+        app.extensions['user_cache'] = self
+
+        if not event.contains(User, 'after_update', self._mark_changed):
+            event.listen(User, 'after_update', self._mark_changed)
+            event.listen(User, 'after_delete', self._mark_changed)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    @staticmethod
+    def key(user_id):
+        return f'user:v{USER_CACHE_VERSION}:{user_id}'
+
+    def load(self, user_id):
+        data = self.cache.get(self.key(user_id))
+        if data is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self._store(user)
+            return user
+
+        # إعادة بناء الكائن وربطه بالجلسة دون استعلام، فتبقى العلاقات (مثل subject) قابلة للتحميل
+        user = User(**data)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def changed(self, *user_ids):
+        # للتحديثات المباشرة (update) التي لا تمر بأحداث ORM: الإلغاء عند الحفظ
+        db.session.info.setdefault('changed_users', set()).update(user_ids)
+
+    def _store(self, user):
+        # النسخة مختومة بـ User.version: إذا سبق عامل آخر وخزن نسخة أحدث (بعد تعديل حفظ
+        # أثناء قراءتنا) لا نستبدلها بالنسخة التي قرأناها قبله
+        key = self.key(user.id)
+        cached = self.cache.get(key)
+        if cached is not None and cached['version'] > user.version:
+            return
+        self.cache.set(key, self._snapshot(user), self.ttl, local_ttl=self.local_ttl)
+
+    def invalidate(self, *user_ids):
+        self.cache.delete(*[self.key(user_id) for user_id in user_ids])
+
+    @staticmethod
+    def _snapshot(user):
+        return {column.key: getattr(user, column.key)
+                for column in User.__mapper__.column_attrs if column.key not in EXCLUDED_COLUMNS}
+
+    # التعديلات تجمع داخل الجلسة، والإلغاء يتم بعد نجاح الحفظ فقط
+    @staticmethod
+    def _mark_changed(mapper, connection, target):
+        inspect(target).session.info.setdefault('changed_users', set()).add(target.id)
+
+    def _after_commit(self, session):
+        changed = session.info.pop('changed_users', None)
+        if changed:
+            self.invalidate(*changed)
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop('changed_users', None)